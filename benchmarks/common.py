@@ -0,0 +1,71 @@
+"""
+Timing and swarm-size helpers shared by the benchmark scripts.
+"""
+import time
+
+import numpy as np
+
+from environment.scenario_loader import Scenario
+
+SIZES = [10, 100, 1000, 10000]
+BRUTE_LIMIT = 5000      # the N x N brute-force arrays stop fitting in RAM
+
+
+def measure(fn, setup=None, min_time=0.2, max_samples=200):
+    """
+    Time fn() and return per-call statistics over repeated samples.
+
+    Without `setup`, each sample runs fn() often enough to last at least a
+    millisecond, so sub-microsecond calls are not lost in timer noise. With
+    `setup`, it is called (untimed) before every single fn() call.
+    """
+    if setup is not None:
+        setup()
+    fn()    # warm-up
+
+    number = 1
+    if setup is None:
+        while number < 10**6:
+            start = time.perf_counter()
+            for _ in range(number):
+                fn()
+            if time.perf_counter() - start >= 1e-3:
+                break
+            number *= 10
+
+    samples = []
+    total = 0.0
+    while total < min_time and len(samples) < max_samples:
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - start
+        samples.append(elapsed / number)
+        total += elapsed
+
+    samples = np.array(samples)
+    return {
+        "median_s": float(np.median(samples)),
+        "mean_s": float(samples.mean()),
+        "min_s": float(samples.min()),
+        "iterations": len(samples) * number,
+    }
+
+
+def swarm_scenarios(scenario_path, sizes=SIZES):
+    """
+    Yield (density, n, scenario) for every swarm size in `sizes`, first in
+    the scenario's own world ("fixed") and then in one scaled to keep four
+    drones per default-sized world ("scaled").
+    """
+    for density in ("fixed", "scaled"):
+        for n in sizes:
+            scenario = Scenario(scenario_path)
+            scenario.drones["count"] = n
+            if density == "scaled":
+                scale = np.sqrt(n / 4)
+                scenario.world["width"] *= scale
+                scenario.world["height"] *= scale
+            yield density, n, scenario
@@ -0,0 +1,61 @@
+"""
+Message delivery cost: brute force vs SpatialHash neighbor pairs.
+
+    python -m benchmarks.messages
+
+Times the "mean message of active drones within sensing radius" step of
+Environment._get_observations for several swarm sizes, both in the default
+100x100 world and in a world scaled to keep drone density constant. The
+hash path includes building the index, as a step does.
+"""
+import numpy as np
+
+from benchmarks.common import BRUTE_LIMIT, measure, swarm_scenarios
+from environment.env import Environment
+
+MESSAGE_DIM = 8
+
+
+def run(scenario_path="configs/scenario.yaml"):
+    rng = np.random.default_rng(0)
+
+    print(f"{'world':>8} {'drones':>7} {'pairs':>10} "
+          f"{'brute ms':>10} {'hash ms':>10}")
+    for density, n, scenario in swarm_scenarios(scenario_path):
+        scenario.communication["message_dim"] = MESSAGE_DIM
+
+        envs = {
+            search: Environment(scenario, neighbor_search=search)
+            for search in ("hash", "brute")
+        }
+        pos = rng.uniform(0, [scenario.world["width"],
+                              scenario.world["height"]], size=(n, 2))
+        messages = rng.uniform(-1, 1, size=(n, MESSAGE_DIM))
+        for env in envs.values():
+            env.reset()
+            env.pos[:] = pos
+            env.messages[:] = messages
+
+        radius = scenario.drone_model["sensing_radius"]
+        ids = np.arange(n)
+        env = envs["hash"]
+
+        def hashed():
+            env.neighbor_index.build(pos, ids)
+            env._message_inbox(pos, radius)
+
+        def brute():
+            envs["brute"]._message_inbox(pos, radius)
+
+        t_hash = measure(hashed)["median_s"] * 1e3
+        pairs = len(env.neighbor_index.pairs_within(pos, radius, ids)[0])
+        if n <= BRUTE_LIMIT:
+            t_brute = f"{measure(brute)['median_s'] * 1e3:10.2f}"
+        else:
+            t_brute = f"{'-':>10}"
+
+        print(f"{density:>8} {n:7d} {pairs:10d} {t_brute} {t_hash:10.2f}")
+
+
+if __name__ == "__main__":
+    run()
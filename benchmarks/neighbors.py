@@ -0,0 +1,47 @@
+"""
+Nearest-neighbor query cost: brute force vs SpatialHash.
+
+    python -m benchmarks.neighbors
+
+Times the "nearest active drone within sensing radius" step of
+Environment._get_observations for several swarm sizes, both in the default
+100x100 world and in a world scaled to keep drone density constant.
+"""
+import numpy as np
+
+from benchmarks.common import BRUTE_LIMIT, measure, swarm_scenarios
+from environment.env import Environment
+
+
+def run(scenario_path="configs/scenario.yaml"):
+    rng = np.random.default_rng(0)
+
+    print(f"{'world':>8} {'drones':>7} {'brute ms':>10} {'hash ms':>10}")
+    for density, n, scenario in swarm_scenarios(scenario_path):
+        env = Environment(scenario)
+        env.reset()
+
+        radius = env.drone_model["sensing_radius"]
+        pos = rng.uniform(
+            0, [env.width, env.height], size=(n, 2)
+        )
+        ids = np.arange(n)
+
+        def hashed():
+            env.neighbor_index.build(pos, ids)
+            env.neighbor_index.nearest_within(pos, radius, ids)
+
+        def brute():
+            env._nearest(pos, pos, radius, exclude_self=True)
+
+        t_hash = measure(hashed)["median_s"] * 1e3
+        if n <= BRUTE_LIMIT:
+            t_brute = f"{measure(brute)['median_s'] * 1e3:10.2f}"
+        else:
+            t_brute = f"{'-':>10}"
+
+        print(f"{density:>8} {n:7d} {t_brute} {t_hash:10.2f}")
+
+
+if __name__ == "__main__":
+    run()
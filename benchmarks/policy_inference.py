@@ -0,0 +1,39 @@
+"""
+Per-step policy inference latency: PPOAgent.act per drone vs act_batch.
+
+    python -m benchmarks.policy_inference
+"""
+import numpy as np
+import torch
+
+from benchmarks.common import measure
+from learning.agent import PPOAgent
+from learning.policy import PolicyNet
+
+SIZES = [4, 64, 1024]
+
+
+def run():
+    torch.manual_seed(0)
+    agent = PPOAgent(PolicyNet(obs_dim=9, act_dim=2))
+    rng = np.random.default_rng(0)
+
+    print(f"{'drones':>7} {'per-drone ms':>13} {'batched ms':>11} {'speedup':>8}")
+    for n in SIZES:
+        obs = rng.standard_normal((n, 9)).astype(np.float32)
+
+        def per_drone():
+            for row in obs:
+                agent.act(row)
+
+        def batched():
+            agent.act_batch(obs)
+
+        t_single = measure(per_drone)["median_s"] * 1e3
+        t_batch = measure(batched)["median_s"] * 1e3
+        print(f"{n:7d} {t_single:13.3f} {t_batch:11.3f} "
+              f"{t_single / t_batch:7.1f}x")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,56 @@
+"""
+Rollout throughput of SubprocVecEnv vs number of worker processes.
+
+    python -m benchmarks.subproc_scaling [--steps 200] [--envs-per-worker 4]
+
+Scaling is bounded by the physical cores available: with W workers on a
+machine with at least W free cores, env-steps/s should grow close to
+linearly in W.
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+
+from environment.scenario_loader import Scenario
+from environment.subproc_env import SubprocVecEnv
+
+WORKERS = [1, 2, 4, 8, 16]
+
+
+def run(steps=200, envs_per_worker=4, scenario_path="configs/scenario.yaml"):
+    scenario = Scenario(scenario_path)
+    rng = np.random.default_rng(0)
+
+    print(f"cores available: {os.cpu_count()}")
+    print(f"{'workers':>8} {'envs':>5} {'env-steps/s':>12} {'scaling':>8}")
+
+    base = None
+    for workers in WORKERS:
+        venv = SubprocVecEnv(scenario, workers, envs_per_worker, seed=0)
+        try:
+            venv.reset()
+            actions = rng.uniform(
+                -1, 1, size=(venv.num_envs, venv.num_drones, 2)
+            )
+            venv.step(actions)
+
+            start = time.perf_counter()
+            for _ in range(steps):
+                venv.step(actions)
+            rate = steps * venv.num_envs / (time.perf_counter() - start)
+        finally:
+            venv.close()
+
+        base = base or rate
+        print(f"{workers:8d} {venv.num_envs:5d} {rate:12.0f} "
+              f"{rate / base:7.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--steps", type=int, default=200)
+    parser.add_argument("--envs-per-worker", type=int, default=4)
+    args = parser.parse_args()
+    run(args.steps, args.envs_per_worker)
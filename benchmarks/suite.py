@@ -0,0 +1,334 @@
+"""
+Benchmark suite for the simulation and learning hot paths.
+
+    python -m benchmarks.suite run --out bench/current.json [--quick]
+    python -m benchmarks.suite compare bench/baseline.json bench/current.json
+
+`run` times Environment.reset/step/step_arrays/_get_observations (and
+step_arrays on the Numba step backend when numba is installed), the
+coverage grid queries (dense and tiled backends), PygameRenderer.draw (on
+SDL's dummy video driver), PPOAgent.act / act_batch and ppo_update over a
+matrix of drone counts, grid sizes, obstacle counts and rollout lengths,
+and writes the results as JSON.
+`compare` prints the per-case change against a saved baseline and exits
+with status 1 if any case got slower than the threshold allows.
+"""
+import argparse
+import importlib.metadata
+import itertools
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.common import measure
+from environment.env import Environment
+from environment.scenario_loader import Scenario
+
+SCENARIO_PATH = "configs/scenario.yaml"
+
+FULL_MATRIX = {
+    "drones": [4, 64, 512],
+    "grid": [80, 256],
+    "obstacles": [5, 100],
+    "rollout": [256, 2048],
+}
+QUICK_MATRIX = {
+    "drones": [4, 64],
+    "grid": [80],
+    "obstacles": [5],
+    "rollout": [256],
+}
+
+
+# -------------------------------------------------
+def make_scenario(drones=4, grid=80, obstacles=5):
+    scenario = Scenario(SCENARIO_PATH)
+    scenario.drones["count"] = drones
+    scenario.coverage["grid_rows"] = grid
+    scenario.coverage["grid_cols"] = grid
+    scenario.obstacles["count"] = obstacles
+    # Episodes must not end, nor drones run flat, while being timed
+    scenario.simulation["max_steps"] = 10**9
+    scenario.coverage["target_percentage"] = 2.0
+    scenario.drone_model["move_cost"] = 0.0
+    return scenario
+
+
+def case_name(group, params):
+    inner = ",".join(f"{k}={v}" for k, v in params.items())
+    return f"{group}[{inner}]"
+
+
+# -------------------------------------------------
+def bench_environment(matrix, results):
+    from environment import step_kernel   # imports numba when installed
+
+    for drones, grid, obstacles in itertools.product(
+        matrix["drones"], matrix["grid"], matrix["obstacles"]
+    ):
+        params = {"drones": drones, "grid": grid, "obstacles": obstacles}
+        random.seed(0)
+        env = Environment(make_scenario(drones, grid, obstacles))
+        env.reset()
+        actions = env.random_actions()
+
+        results[case_name("env.reset", params)] = measure(env.reset)
+        env.reset()
+        results[case_name("env.step", params)] = measure(
+            lambda: env.step(actions)
+        )
+        action_array = np.array(list(actions.values()))
+        results[case_name("env.step_arrays", params)] = measure(
+            lambda: env.step_arrays(action_array)
+        )
+        results[case_name("env._get_observations", params)] = measure(
+            env._get_observations
+        )
+
+        if step_kernel.AVAILABLE:
+            random.seed(0)
+            compiled = Environment(
+                make_scenario(drones, grid, obstacles), step_backend="numba"
+            )
+            compiled.reset()
+            results[case_name("env.step_arrays_numba", params)] = measure(
+                lambda: compiled.step_arrays(action_array)
+            )
+
+
+def bench_coverage(matrix, results):
+    for backend, drones, grid in itertools.product(
+        ("dense", "tiled"), matrix["drones"], matrix["grid"]
+    ):
+        params = {"backend": backend, "drones": drones, "grid": grid}
+        scenario = make_scenario(drones, grid)
+        scenario.coverage["backend"] = backend
+        env = Environment(scenario)
+        env.reset()
+        cg = env.coverage_grid
+        radius = env.drone_model["sensing_radius"]
+
+        rng = np.random.default_rng(0)
+        xs = rng.uniform(0, env.width, drones)
+        ys = rng.uniform(0, env.height, drones)
+
+        def mark():
+            for x, y in zip(xs, ys):
+                cg.mark_covered(x, y)
+
+        def local():
+            for x, y in zip(xs, ys):
+                cg.local_coverage(x, y, radius)
+
+        results[case_name("coverage.mark_covered", params)] = measure(
+            mark, setup=cg.reset
+        )
+        results[case_name("coverage.mark_covered_many", params)] = measure(
+            lambda: cg.mark_covered_many(xs, ys), setup=cg.reset
+        )
+        mark()
+        results[case_name("coverage.local_coverage", params)] = measure(local)
+        results[case_name("coverage.local_coverage_many", params)] = measure(
+            lambda: cg.local_coverage_many(xs, ys, radius)
+        )
+        results[case_name("coverage.get_coverage_percentage", params)] = (
+            measure(cg.get_coverage_percentage)
+        )
+
+
+def bench_renderer(matrix, results):
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    try:
+        import pygame
+        from environment.pygame_renderer import PygameRenderer
+    except ImportError:
+        print("pygame not installed; skipping renderer benchmarks")
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for drones, grid in itertools.product(matrix["drones"], matrix["grid"]):
+            params = {"drones": drones, "grid": grid}
+            scenario = make_scenario(drones, grid)
+
+            # The map image is not shipped with the repo; use a plain one
+            if not os.path.exists(scenario.map["image_path"]):
+                pygame.init()
+                pygame.display.set_mode((1, 1))
+                blank = pygame.Surface((64, 64))
+                blank.fill((40, 40, 40))
+                path = os.path.join(tmp, "map.png")
+                pygame.image.save(blank, path)
+                scenario.map["image_path"] = path
+
+            renderer = PygameRenderer(scenario)
+            renderer.fps = 0    # no frame cap while timing
+            env = Environment(scenario)
+            env.reset()
+            for _ in range(50):
+                env.step(env.random_actions())
+
+            results[case_name("renderer.draw", params)] = measure(
+                lambda: renderer.draw(env), max_samples=200
+            )
+            pygame.quit()
+
+
+def bench_learning(matrix, results):
+    try:
+        import torch
+    except ImportError:
+        print("torch not installed; skipping learning benchmarks")
+        return
+    from learning.agent import PPOAgent
+    from learning.buffer import RolloutBuffer
+    from learning.policy import PolicyNet
+    from learning.ppo import ppo_update
+
+    torch.manual_seed(0)
+    policy = PolicyNet(obs_dim=9, act_dim=2)
+    agent = PPOAgent(policy)
+    rng = np.random.default_rng(0)
+
+    row = rng.standard_normal(9).astype(np.float32)
+    results["agent.act"] = measure(lambda: agent.act(row))
+
+    for drones in matrix["drones"]:
+        obs = rng.standard_normal((drones, 9)).astype(np.float32)
+        results[case_name("agent.act_batch", {"drones": drones})] = measure(
+            lambda: agent.act_batch(obs)
+        )
+
+    for rollout, drones in itertools.product(
+        matrix["rollout"], matrix["drones"]
+    ):
+        params = {"rollout": rollout, "drones": drones}
+        buffer = RolloutBuffer(rollout, drones)
+        for _ in range(rollout):
+            buffer.add(
+                rng.standard_normal((drones, 9)),
+                rng.standard_normal((drones, 2)),
+                rng.standard_normal(drones),
+                rng.standard_normal(drones),
+                rng.standard_normal(drones),
+                rng.random(drones) < 0.005,
+            )
+
+        optimizer = torch.optim.Adam(policy.parameters(), lr=3e-4)
+        results[case_name("ppo_update", params)] = measure(
+            lambda: ppo_update(policy, optimizer, buffer, minibatch_size=512),
+            max_samples=20,
+        )
+
+
+BENCHMARKS = {
+    "environment": bench_environment,
+    "coverage": bench_coverage,
+    "renderer": bench_renderer,
+    "learning": bench_learning,
+}
+
+
+# -------------------------------------------------
+def _version(package):
+    """Installed version of an optional package (None if missing), without
+    importing it."""
+    try:
+        return importlib.metadata.version(package)
+    except importlib.metadata.PackageNotFoundError:
+        return None
+
+
+def run(out, quick=False, only=None):
+    matrix = QUICK_MATRIX if quick else FULL_MATRIX
+    results = {}
+
+    for group, bench in BENCHMARKS.items():
+        if only and group not in only:
+            continue
+        print(f"== {group}")
+        start = time.perf_counter()
+        bench(matrix, results)
+        print(f"   {time.perf_counter() - start:.1f}s")
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "torch": _version("torch"),
+            "numba": _version("numba"),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "matrix": matrix,
+        },
+        "results": results,
+    }
+
+    if os.path.dirname(out):
+        os.makedirs(os.path.dirname(out), exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    print(f"wrote {len(results)} results to {out}")
+
+
+def compare(baseline_path, current_path, threshold=0.10):
+    """
+    Print median time changes per case; returns the names of cases slower
+    than baseline by more than `threshold` (0.10 = 10%).
+    """
+    with open(baseline_path) as f:
+        baseline = json.load(f)["results"]
+    with open(current_path) as f:
+        current = json.load(f)["results"]
+
+    regressions = []
+    print(f"{'case':<60} {'baseline':>12} {'current':>12} {'change':>8}")
+    for name in sorted(set(baseline) & set(current)):
+        old = baseline[name]["median_s"]
+        new = current[name]["median_s"]
+        change = new / old - 1.0 if old > 0 else 0.0
+
+        flag = ""
+        if change > threshold:
+            flag = "  SLOWER"
+            regressions.append(name)
+
+        print(f"{name:<60} {old * 1e6:10.1f}us {new * 1e6:10.1f}us "
+              f"{change:+7.1%}{flag}")
+
+    for name in sorted(set(baseline) ^ set(current)):
+        where = "baseline" if name in baseline else "current"
+        print(f"{name:<60} only in {where}")
+
+    print(f"{len(regressions)} case(s) slower than {threshold:.0%}")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_run = sub.add_parser("run", help="run the benchmarks")
+    p_run.add_argument("--out", default="bench/current.json")
+    p_run.add_argument("--quick", action="store_true",
+                       help="small parameter matrix")
+    p_run.add_argument("--only", nargs="+", choices=list(BENCHMARKS))
+
+    p_cmp = sub.add_parser("compare", help="compare against a baseline")
+    p_cmp.add_argument("baseline")
+    p_cmp.add_argument("current")
+    p_cmp.add_argument("--threshold", type=float, default=0.10,
+                       help="allowed slowdown as a fraction (default 0.10)")
+
+    args = parser.parse_args()
+    if args.command == "run":
+        run(args.out, args.quick, args.only)
+    else:
+        sys.exit(1 if compare(args.baseline, args.current, args.threshold)
+                 else 0)
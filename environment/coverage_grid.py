@@ -1,6 +1,17 @@
 import numpy as np
 
-class CoverageGrid:
+# Set bits of every byte value
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+class _GridBase:
+    """
+    Cell geometry shared by the coverage backends: world-to-cell mapping
+    and the clamped windows local coverage counts over, so both backends
+    map positions to the same cells. Subclasses provide covered_cells and
+    _window_count(r0, r1, c0, c1).
+    """
+
     def __init__(self, width, height, rows, cols):
         self.width = width
         self.height = height
@@ -11,11 +22,6 @@ class CoverageGrid:
         self.cell_height = height / rows
         self.cell_size = min(self.cell_width, self.cell_height)
 
-        self.grid = np.zeros((rows, cols), dtype=np.bool_)
-
-    def reset(self):
-        self.grid[:] = False
-
     def world_to_cell(self, x, y):
         col = int(x / self.cell_width)
         row = int(y / self.cell_height)
@@ -25,25 +31,366 @@ class CoverageGrid:
 
         return row, col
 
+    def world_to_cells(self, xs, ys):
+        cols = (np.asarray(xs) / self.cell_width).astype(np.int64)
+        rows = (np.asarray(ys) / self.cell_height).astype(np.int64)
+
+        rows = np.clip(rows, 0, self.rows - 1)
+        cols = np.clip(cols, 0, self.cols - 1)
+
+        return rows, cols
+
+    def _window(self, r, c, rad):
+        """Rows r0:r1 and cols c0:c1 within `rad` cells of (r, c)."""
+        return (max(0, r - rad), min(self.rows, r + rad + 1),
+                max(0, c - rad), min(self.cols, c + rad + 1))
+
+    def _windows(self, rows, cols, rad):
+        """_window for arrays of cells."""
+        return (
+            np.maximum(rows - rad, 0), np.minimum(rows + rad + 1, self.rows),
+            np.maximum(cols - rad, 0), np.minimum(cols + rad + 1, self.cols),
+        )
+
+    def get_coverage_percentage(self):
+        return self.covered_cells / (self.rows * self.cols)
+
+    def local_coverage(self, x, y, radius):
+        r, c = self.world_to_cell(x, y)
+        r0, r1, c0, c1 = self._window(r, c, int(radius / self.cell_size))
+
+        total = (r1 - r0) * (c1 - c0)
+        return self._window_count(r0, r1, c0, c1) / total if total > 0 else 0
+
+
+class CoverageGrid(_GridBase):
+    def __init__(self, width, height, rows, cols):
+        super().__init__(width, height, rows, cols)
+
+        self.grid = np.zeros((rows, cols), dtype=np.bool_)
+
+        # Running count of covered cells and a summed-area table of the grid
+        # (zero first row/column), both kept in step with every mark so
+        # coverage queries never scan the grid.
+        self.covered_cells = 0
+        self.table = np.zeros((rows + 1, cols + 1), dtype=np.int32)
+
+        # Flat indices of the cells the last mark_covered_many() call added
+        self.last_new_cells = np.zeros(0, dtype=np.int64)
+
+    @classmethod
+    def from_spec(cls, spec):
+        """Grid for a CompiledScenario."""
+        return cls(spec.width, spec.height, spec.grid_rows, spec.grid_cols)
+
+    def reset(self):
+        self.grid[:] = False
+        self.covered_cells = 0
+        self.table[:] = 0
+        self.last_new_cells = np.zeros(0, dtype=np.int64)
+
     def mark_covered(self, x, y):
         r, c = self.world_to_cell(x, y)
+        if self.grid[r, c]:
+            return
+
         self.grid[r, c] = True
+        self.covered_cells += 1
+        self.table[r + 1:, c + 1:] += 1
 
-    def get_coverage_percentage(self):
-        return np.sum(self.grid) / self.grid.size
+    def mark_covered_many(self, xs, ys):
+        """Mark the cells under all (x, y) points; returns how many were new."""
+        rows, cols = self.world_to_cells(xs, ys)
+        cells = rows * self.cols + cols
 
-    def local_coverage(self, x, y, radius):
+        fresh = np.unique(cells[~self.grid.ravel()[cells]])
+        self.last_new_cells = fresh
+        if len(fresh) == 0:
+            return 0
+
+        self.grid.ravel()[fresh] = True
+        self.covered_cells += len(fresh)
+
+        # A few new cells are cheaper to add in place than a full rebuild
+        if len(fresh) <= 4:
+            for cell in fresh.tolist():
+                r, c = divmod(cell, self.cols)
+                self.table[r + 1:, c + 1:] += 1
+        else:
+            np.cumsum(self.grid, axis=0, dtype=np.int32, out=self.table[1:, 1:])
+            np.cumsum(self.table[1:, 1:], axis=1, out=self.table[1:, 1:])
+
+        return len(fresh)
+
+    def _window_count(self, r0, r1, c0, c1):
+        """Covered cells in rows r0:r1, cols c0:c1."""
+        t = self.table
+        return int(t[r1, c1] - t[r0, c1] - t[r1, c0] + t[r0, c0])
+
+    def local_coverage_many(self, xs, ys, radius):
+        """Vectorized local_coverage for arrays of positions."""
+        rows, cols = self.world_to_cells(xs, ys)
+        r0, r1, c0, c1 = self._windows(rows, cols, int(radius / self.cell_size))
+
+        t = self.table
+        covered = t[r1, c1] - t[r0, c1] - t[r1, c0] + t[r0, c0]
+        total = (r1 - r0) * (c1 - c0)
+
+        return covered / total
+
+    def covered_indices(self):
+        """Flat indices of all covered cells, ascending."""
+        return np.flatnonzero(self.grid)
+
+
+class TiledCoverageGrid(_GridBase):
+    """
+    CoverageGrid with the same interface for very large grids.
+
+    Cells are stored one bit each in square tiles of `tile_size` cells,
+    allocated on first touch from a growing pool; untouched tiles cost
+    nothing. Each tile keeps a popcount, so coverage queries over whole
+    tiles never look at bits, and reset() only clears the tiles that were
+    used. `grid` builds a dense copy and is meant for small maps only
+    (renderers, debugging).
+    """
+
+    def __init__(self, width, height, rows, cols, tile_size=128):
+        if tile_size <= 0 or tile_size % 8:
+            raise ValueError(
+                f"tile_size must be a positive multiple of 8, got {tile_size}"
+            )
+
+        super().__init__(width, height, rows, cols)
+        self.tile_size = tile_size
+
+        self.tile_rows = -(-rows // tile_size)
+        self.tile_cols = -(-cols // tile_size)
+        num_tiles = self.tile_rows * self.tile_cols
+
+        # ---- Tile pool ----
+        # tile_slot[tile] = pool slot (-1 = never touched), slot_tile is the
+        # reverse map for the first `used` slots.
+        self.tile_slot = np.full(num_tiles, -1, dtype=np.int64)
+        self.slot_tile = np.zeros(16, dtype=np.int64)
+        self.bits = np.zeros((16, tile_size, tile_size // 8), dtype=np.uint8)
+        self.used = 0
+
+        # ---- Counts ----
+        self.covered_cells = 0
+        self.tile_count = np.zeros(num_tiles, dtype=np.int64)
+        self._tile_table = np.zeros(
+            (self.tile_rows + 1, self.tile_cols + 1), dtype=np.int64
+        )
+        self._table_dirty = False
+
+        self.last_new_cells = np.zeros(0, dtype=np.int64)
+
+    @classmethod
+    def from_spec(cls, spec):
+        return cls(spec.width, spec.height, spec.grid_rows, spec.grid_cols,
+                   spec.coverage_tile_size)
+
+    def reset(self):
+        touched = self.slot_tile[:self.used]
+        self.bits[:self.used] = 0
+        self.tile_slot[touched] = -1
+        self.tile_count[touched] = 0
+        self.used = 0
+
+        self.covered_cells = 0
+        self._table_dirty = True
+        self.last_new_cells = np.zeros(0, dtype=np.int64)
+
+    def _allocate(self, tiles):
+        need = self.used + len(tiles)
+        if need > len(self.bits):
+            capacity = max(need, 2 * len(self.bits))
+            bits = np.zeros((capacity,) + self.bits.shape[1:], np.uint8)
+            bits[:self.used] = self.bits[:self.used]
+            slot_tile = np.zeros(capacity, dtype=np.int64)
+            slot_tile[:self.used] = self.slot_tile[:self.used]
+            self.bits, self.slot_tile = bits, slot_tile
+
+        self.tile_slot[tiles] = np.arange(self.used, need)
+        self.slot_tile[self.used:need] = tiles
+        self.used = need
+
+    # -------------------------------------------------
+    def mark_covered(self, x, y):
+        T = self.tile_size
         r, c = self.world_to_cell(x, y)
+        tile = (r // T) * self.tile_cols + c // T
+        if self.tile_slot[tile] < 0:
+            self._allocate(np.array([tile]))
+
+        where = (self.tile_slot[tile], r % T, (c % T) >> 3)
+        mask = 1 << (c & 7)
+        if self.bits[where] & mask:
+            return
+
+        self.bits[where] |= mask
+        self.tile_count[tile] += 1
+        self.covered_cells += 1
+        self._table_dirty = True
+
+    def mark_covered_many(self, xs, ys):
+        """Mark the cells under all (x, y) points; returns how many were new."""
+        T = self.tile_size
+        rows, cols = self.world_to_cells(xs, ys)
+        cells = np.unique(rows * self.cols + cols)
+        rows, cols = np.divmod(cells, self.cols)
+
+        tiles = (rows // T) * self.tile_cols + cols // T
+        slots = self.tile_slot[tiles]
+        missing = slots < 0
+        if missing.any():
+            self._allocate(np.unique(tiles[missing]))
+            slots = self.tile_slot[tiles]
+
+        r = rows % T
+        byte = (cols % T) >> 3
+        mask = np.left_shift(1, cols & 7).astype(np.uint8)
+        fresh = (self.bits[slots, r, byte] & mask) == 0
+
+        self.last_new_cells = cells[fresh]
+        n = len(self.last_new_cells)
+        if n == 0:
+            return 0
+
+        np.bitwise_or.at(
+            self.bits, (slots[fresh], r[fresh], byte[fresh]), mask[fresh]
+        )
+        np.add.at(self.tile_count, tiles[fresh], 1)
+        self.covered_cells += n
+        self._table_dirty = True
+        return n
+
+    # -------------------------------------------------
+    def local_coverage_many(self, xs, ys, radius):
+        """Vectorized local_coverage for arrays of positions."""
+        rows, cols = self.world_to_cells(xs, ys)
         rad = int(radius / self.cell_size)
+        size = 2 * rad + 1
+
+        if size <= self.tile_size:
+            return self._small_windows(rows, cols, rad)
+
+        out = np.zeros(len(rows))
+        for k, (r, c) in enumerate(zip(rows.tolist(), cols.tolist())):
+            r0, r1, c0, c1 = self._window(r, c, rad)
+            total = (r1 - r0) * (c1 - c0)
+            out[k] = self._window_count(r0, r1, c0, c1) / total
+        return out
+
+    def _small_windows(self, rows, cols, rad, chunk=1 << 20):
+        # Windows span at most two tiles per axis: read them byte by byte
+        # (a byte never straddles tiles) and popcount the masked bytes.
+        T = self.tile_size
+        size = 2 * rad + 1
+        nbytes = (size + 6) // 8 + 1
+        out = np.zeros(len(rows))
+        step = max(1, chunk // (size * nbytes))
+
+        for lo in range(0, len(rows), step):
+            r0, r1, c0, c1 = self._windows(
+                rows[lo:lo + step], cols[lo:lo + step], rad
+            )
+
+            R = r0[:, None] + np.arange(size)
+            in_r = R < r1[:, None]
+            R = np.minimum(R, self.rows - 1)
+
+            # Global byte columns and the bits of each inside the window
+            G = (c0 // 8)[:, None] + np.arange(nbytes)
+            low = np.clip(c0[:, None] - 8 * G, 0, 8)
+            high = np.clip(c1[:, None] - 8 * G, 0, 8)
+            mask = ((1 << high) - (1 << low)).astype(np.uint8)
+            G = np.minimum(G, (self.cols - 1) // 8)
+
+            tiles = (
+                (R // T)[:, :, None] * self.tile_cols + (G * 8 // T)[:, None]
+            )
+            slots = self.tile_slot[tiles]
+            byte = self.bits[
+                np.maximum(slots, 0),
+                (R % T)[:, :, None],
+                (G % (T // 8))[:, None, :]
+            ] & mask[:, None, :]
+
+            counts = _POPCOUNT[byte] * ((slots >= 0) & in_r[:, :, None])
+            covered = counts.sum(axis=(1, 2))
+            out[lo:lo + step] = covered / ((r1 - r0) * (c1 - c0))
+
+        return out
+
+    def _window_count(self, r0, r1, c0, c1):
+        """Covered cells in rows r0:r1, cols c0:c1."""
+        T = self.tile_size
+        tr0, tr1 = r0 // T, (r1 - 1) // T + 1
+        tc0, tc1 = c0 // T, (c1 - 1) // T + 1
+
+        # Tiles entirely inside the window: popcounts via the tile table
+        ir0, ir1 = -(-r0 // T), r1 // T
+        ic0, ic1 = -(-c0 // T), c1 // T
+        count = 0
+        if ir0 < ir1 and ic0 < ic1:
+            t = self._tile_sums()
+            count += int(t[ir1, ic1] - t[ir0, ic1] - t[ir1, ic0] + t[ir0, ic0])
+        else:
+            ir0 = ir1 = ic0 = ic1 = 0
+
+        # Partly covered border tiles: count their bits
+        tr, tc = np.meshgrid(np.arange(tr0, tr1), np.arange(tc0, tc1),
+                             indexing="ij")
+        border = ~((tr >= ir0) & (tr < ir1) & (tc >= ic0) & (tc < ic1))
+        tr, tc = tr[border], tc[border]
+        slots = self.tile_slot[tr * self.tile_cols + tc]
+        keep = slots >= 0
+
+        for a, b, slot in zip(tr[keep].tolist(), tc[keep].tolist(),
+                              slots[keep].tolist()):
+            lr0, lr1 = max(r0 - a * T, 0), min(r1 - a * T, T)
+            lc0, lc1 = max(c0 - b * T, 0), min(c1 - b * T, T)
+            block = np.unpackbits(
+                self.bits[slot, lr0:lr1], axis=1, bitorder="little"
+            )
+            count += int(np.count_nonzero(block[:, lc0:lc1]))
+
+        return count
+
+    def _tile_sums(self):
+        if self._table_dirty:
+            counts = self.tile_count.reshape(self.tile_rows, self.tile_cols)
+            t = self._tile_table
+            np.cumsum(counts, axis=0, out=t[1:, 1:])
+            np.cumsum(t[1:, 1:], axis=1, out=t[1:, 1:])
+            self._table_dirty = False
+        return self._tile_table
+
+    # -------------------------------------------------
+    def covered_indices(self):
+        """Flat indices of all covered cells, ascending."""
+        T = self.tile_size
+        if self.used == 0:
+            return np.zeros(0, dtype=np.int64)
+
+        bits = np.unpackbits(self.bits[:self.used], axis=2, bitorder="little")
+        slot, r, c = np.nonzero(bits)
+        tiles = self.slot_tile[slot]
+        rows = (tiles // self.tile_cols) * T + r
+        cols = (tiles % self.tile_cols) * T + c
+        return np.sort(rows * self.cols + cols)
 
-        total = 0
-        covered = 0
+    @property
+    def grid(self):
+        grid = np.zeros((self.rows, self.cols), dtype=np.bool_)
+        grid.ravel()[self.covered_indices()] = True
+        return grid
 
-        for i in range(r - rad, r + rad + 1):
-            for j in range(c - rad, c + rad + 1):
-                if 0 <= i < self.rows and 0 <= j < self.cols:
-                    total += 1
-                    if self.grid[i, j]:
-                        covered += 1
 
-        return covered / total if total > 0 else 0
+def make_coverage_grid(spec):
+    """The coverage backend the scenario's coverage block asks for."""
+    if spec.coverage_backend == "tiled":
+        return TiledCoverageGrid.from_spec(spec)
+    return CoverageGrid.from_spec(spec)
@@ -1,201 +1,542 @@
 import random
+import warnings
 import numpy as np
-from environment.coverage_grid import CoverageGrid
+from environment.coverage_grid import make_coverage_grid
+from environment.spatial_hash import SpatialHash
+from environment.obstacle_field import ObstacleField
+from environment.profiler import StepProfiler
+from environment.trail_buffer import TrailBuffer
 import math
 
 
+class DroneView:
+    """
+    Read-only, dict-style view of one drone in `Environment`'s state arrays.
+
+    Lets renderers keep using d["x"], d["active"], ... while the simulation
+    itself works on whole arrays.
+    """
+
+    __slots__ = ("_env", "_i")
+
+    def __init__(self, env, i):
+        self._env = env
+        self._i = i
+
+    def __getitem__(self, key):
+        env, i = self._env, self._i
+
+        if key == "x":
+            return float(env.pos[i, 0])
+        if key == "y":
+            return float(env.pos[i, 1])
+        if key == "heading":
+            return float(env.heading[i])
+        if key == "battery":
+            return float(env.battery[i])
+        if key == "active":
+            return bool(env.active[i])
+        if key == "angular_velocity":
+            return 0.0
+        if key == "path":
+            return env.trail(i)
+        raise KeyError(key)
+
+
 class Environment:
-    def __init__(self, scenario):
+    """
+    Multi-drone coverage world.
+
+    Two equivalent interfaces:
+      * reset_arrays() / step_arrays(): actions as one (N, act_dim) array;
+        observations (N, obs_dim) float32, rewards (N,) and the active mask
+        come back as arrays, written into caller-supplied buffers when
+        given and otherwise into buffers the environment reuses every step.
+      * reset() / step(): the original per-drone dicts {i: ...}, kept as a
+        thin adapter over the array core for existing scripts.
+
+    `step_backend` ("numpy" or "numba", default: the scenario's
+    simulation.step_backend) picks how a step is computed; "numba" runs
+    it through compiled kernels (environment/step_kernel.py) with the same
+    results, and falls back to "numpy" with a warning when Numba is not
+    installed. Profiled steps always take the NumPy path, which has the
+    phases to time.
+    """
+
+    def __init__(self, scenario, dtype=np.float32, neighbor_search="hash",
+                 profile=False, step_backend=None):
+        if neighbor_search not in ("hash", "brute"):
+            raise ValueError(
+                f"neighbor_search must be 'hash' or 'brute', "
+                f"got {neighbor_search!r}"
+            )
+
         self.scenario = scenario
+        self.spec = spec = scenario.compile()
+        self.dtype = dtype
+        self.neighbor_search = neighbor_search
+
+        # ---- Step backend ----
+        step_backend = step_backend or spec.step_backend
+        if step_backend not in ("numpy", "numba"):
+            raise ValueError(
+                f"step_backend must be 'numpy' or 'numba', got {step_backend!r}"
+            )
+        self._kernels = None
+        if step_backend == "numba":
+            if spec.coverage_backend != "dense" or spec.message_dim:
+                raise ValueError(
+                    "the numba step backend needs the dense coverage backend "
+                    "and no message channel"
+                )
+            from environment import step_kernel
+            if step_kernel.AVAILABLE:
+                self._kernels = step_kernel
+            else:
+                warnings.warn(
+                    "numba is not installed; using the NumPy step",
+                    RuntimeWarning, stacklevel=2
+                )
+                step_backend = "numpy"
+        self.step_backend = step_backend
 
         # ---- Drone model (ALL drone properties live here) ----
         self.drone_model = scenario.drone_model
-        self.num_drones = scenario.drones["count"]
+        self.num_drones = spec.num_drones
 
         # ---- World ----
-        self.width = scenario.world["width"]
-        self.height = scenario.world["height"]
+        self.width = spec.width
+        self.height = spec.height
 
         # ---- Coverage grid ----
-        self.coverage_grid = CoverageGrid(
+        self.coverage_grid = make_coverage_grid(spec)
+
+        # ---- Simulation ----
+        self.max_steps = spec.max_steps
+
+        self.current_step = 0
+        self.collisions = 0   # blocked moves this episode
+
+        # ---- Drone state (struct of arrays) ----
+        n = self.num_drones
+        self.pos = np.zeros((n, 2), dtype=dtype)
+        self.heading = np.zeros(n, dtype=dtype)
+        self.battery = np.zeros(n, dtype=dtype)
+        self.active = np.zeros(n, dtype=np.bool_)
+
+        # ---- Message channel ----
+        # messages[i]: what drone i sent with its latest action; observed,
+        # averaged, by the active drones within sensing radius
+        self.message_dim = spec.message_dim
+        self.obs_dim = spec.obs_dim
+        self.act_dim = spec.act_dim
+        self.messages = np.zeros((n, spec.message_dim), dtype=dtype)
+
+        self.drones = [DroneView(self, i) for i in range(n)]
+        self.trails = TrailBuffer(n, spec.trail_length, dtype)
+        self.obstacles = np.zeros((0, 2), dtype=np.float64)
+
+        # ---- Neighbor index (cell size = sensing radius) ----
+        self.neighbor_index = SpatialHash(spec.sensing_radius)
+
+        # ---- Nearest-obstacle raster (rebuilt on reset) ----
+        self.obstacle_field = ObstacleField(
             self.width,
             self.height,
-            scenario.coverage["grid_rows"],
-            scenario.coverage["grid_cols"]
+            spec.field_resolution,
+            reach=max(spec.obstacle_radius, spec.sensing_radius)
         )
 
-        # ---- Simulation ----
-        self.max_steps = scenario.simulation["max_steps"]
+        # ---- Per-phase step timings (None = off, no cost) ----
+        self.profiler = StepProfiler() if profile else None
 
-        self.current_step = 0
-        self.drones = []
-        self.obstacles = []
+        # ---- Array API output buffers (overwritten every step) ----
+        self._all_ids = np.arange(n)
+        self._obs = np.zeros((n, spec.obs_dim), dtype=np.float32)
+        self._rewards = np.zeros(n)
+        self._active = np.zeros(n, dtype=np.bool_)
+
+        # ---- Step kernel scratch ----
+        self._new_cells = np.zeros(n, dtype=np.int64)
+        self._moved = np.zeros(n, dtype=np.bool_)
+        self._direction = np.zeros((n, 2))
 
+        # Rewards of the latest step, for the renderer and recorder
+        self.last_reward_ids = np.zeros(0, dtype=np.int64)
+        self.last_reward_values = np.zeros(0)
+
+    # -------------------------------------------------
     def reset(self):
+        """Start an episode; returns {i: observation of drone i}."""
+        obs = self.reset_arrays(
+            np.empty((self.num_drones, self.spec.obs_dim), dtype=np.float32)
+        )
+        return {i: obs[i] for i in range(self.num_drones)}
+
+    def reset_arrays(self, obs=None):
+        """
+        Start an episode; returns the (N, obs_dim) observations, in `obs`
+        when given.
+        """
         self.current_step = 0
+        self.collisions = 0
         self.coverage_grid.reset()
-        self.drones.clear()
-        self.obstacles.clear()
 
         # ---- Obstacles ----
-        if self.scenario.obstacles["enabled"]:
-            for _ in range(self.scenario.obstacles["count"]):
-                self.obstacles.append((
+        obstacles = []
+        if self.spec.obstacles_enabled:
+            for _ in range(self.spec.num_obstacles):
+                obstacles.append((
                     random.uniform(10, self.width - 10),
                     random.uniform(10, self.height - 10)
                 ))
+        self.obstacles = np.array(obstacles, dtype=np.float64).reshape(-1, 2)
+        self.obstacle_field.build(self.obstacles)
 
         # ---- Drones ----
-        for _ in range(self.num_drones):
-            d = {
-                "x": random.uniform(0, self.width),
-                "y": random.uniform(0, self.height),
-                "battery": self.drone_model["max_battery"],
-                "heading": 0.0,
-                "angular_velocity": 0.0,
-                "active": True,
-                "path": []
-            }
-            self.drones.append(d)
-            self.coverage_grid.mark_covered(d["x"], d["y"])
+        for i in range(self.num_drones):
+            self.pos[i] = (
+                random.uniform(0, self.width),
+                random.uniform(0, self.height)
+            )
+        self.coverage_grid.mark_covered_many(self.pos[:, 0], self.pos[:, 1])
+
+        self.heading[:] = 0.0
+        self.battery[:] = self.spec.max_battery
+        self.active[:] = True
+        self.messages[:] = 0.0
 
-        return self._get_observations()
+        self.trails.clear()
+        self.trails.push(self.pos)
+        self.last_reward_ids = np.zeros(0, dtype=np.int64)
+        self.last_reward_values = np.zeros(0)
+
+        return self._observe(obs)
 
     def step(self, actions):
+        """
+        Advance one step with actions {i: (dx, dy[, message...])}; drones
+        without an entry stay put and get no reward. Returns
+        (obs dict, rewards dict, done, info).
+        """
+        ids = np.fromiter(actions.keys(), dtype=np.int64, count=len(actions))
+        act = np.array(
+            list(actions.values()), dtype=np.float64
+        ).reshape(-1, self.spec.act_dim)
+
+        obs = np.empty((self.num_drones, self.spec.obs_dim), dtype=np.float32)
+        done, info = self._step(ids, act, obs)
+
+        rewards = dict(zip(
+            self.last_reward_ids.tolist(), self.last_reward_values.tolist()
+        ))
+        return {i: obs[i] for i in range(self.num_drones)}, rewards, done, info
+
+    def step_arrays(self, actions, obs=None, rewards=None, active=None):
+        """
+        Advance one step with an (N, act_dim) action array (one row per
+        drone; rows of inactive drones are ignored). Returns (obs, rewards,
+        active, done, info): (N, obs_dim) float32 observations, (N,)
+        rewards and the (N,) active mask after the step, each written into
+        the given buffer or else into one the next step overwrites.
+        """
+        act = np.asarray(actions, dtype=np.float64).reshape(
+            self.num_drones, self.spec.act_dim
+        )
+        obs = self._obs if obs is None else obs
+        rewards = self._rewards if rewards is None else rewards
+        active = self._active if active is None else active
+
+        done, info = self._step(self._all_ids, act, obs)
+        rewards[...] = self.last_reward_values
+        active[...] = self.active
+        return obs, rewards, active, done, info
+
+    def _step(self, ids, act, obs):
+        """Shared core: drones `ids` take actions `act`; obs goes to `obs`."""
+        prof = self.profiler
+        if prof is None and self._kernels is not None:
+            return self._step_compiled(ids, act, obs)
+        if prof is not None:
+            prof.start()
+
+        spec = self.spec
         self.current_step += 1
-        rewards = {}
 
         prev_coverage = self.coverage_grid.get_coverage_percentage()
 
-        for i, action in actions.items():
-            d = self.drones[i]
-
-            if not d["active"]:
-                rewards[i] = -1.0   # dead drone penalty
-                continue
-
-            dx, dy = action
-            norm = np.hypot(dx, dy) + 1e-8
-            dx /= norm
-            dy /= norm
-
-            d["heading"] = np.arctan2(dy, dx)
-
-            nx = d["x"] + dx * self.drone_model["move_step"]
-            ny = d["y"] + dy * self.drone_model["move_step"]
-
-            collided = False
-            for ox, oy in self.obstacles:
-                if np.hypot(nx - ox, ny - oy) < self.scenario.obstacles["radius"]:
-                    collided = True
-                    break
-
-            if not collided:
-                d["x"] = np.clip(nx, 0, self.width)
-                d["y"] = np.clip(ny, 0, self.height)
-
-            # Battery cost
-            d["battery"] -= self.drone_model["move_cost"]
-            if d["battery"] <= 0:
-                d["active"] = False
-
-            # Coverage
-            self.coverage_grid.mark_covered(d["x"], d["y"])
-
-            # ---------- Reward components ----------
-            reward = 0.0
-
-            # Battery penalty
-            reward -= 0.01
-
-            # Collision penalty
-            if collided:
-                reward -= 0.2
-
-            rewards[i] = reward
+        # Dead drones are skipped and only get the penalty below
+        moving = self.active[ids]
+        idx = ids[moving]
+        dx = act[moving, 0]
+        dy = act[moving, 1]
+
+        norm = np.hypot(dx, dy) + 1e-8
+        dx /= norm
+        dy /= norm
+
+        self.heading[idx] = np.arctan2(dy, dx)
+        if spec.message_dim:
+            self.messages[idx] = np.clip(act[moving, 2:], -1.0, 1.0)
+
+        nx = self.pos[idx, 0] + dx * spec.move_step
+        ny = self.pos[idx, 1] + dy * spec.move_step
+        if prof is not None:
+            prof.lap("move")
+
+        # ---- Obstacle collision ----
+        _, dist = self.obstacle_field.nearest(np.stack([nx, ny], axis=1))
+        collided = dist < spec.obstacle_radius
+        self.collisions += int(np.count_nonzero(collided))
+
+        free = idx[~collided]
+        self.pos[free, 0] = np.clip(nx[~collided], 0, self.width)
+        self.pos[free, 1] = np.clip(ny[~collided], 0, self.height)
+        self.trails.push(self.pos)
+        if prof is not None:
+            prof.lap("collision")
+
+        # ---- Battery cost ----
+        self.battery[idx] -= spec.move_cost
+        self.active[idx] = self.battery[idx] > 0
+        if prof is not None:
+            prof.lap("battery")
+
+        # ---- Coverage ----
+        self.coverage_grid.mark_covered_many(self.pos[idx, 0], self.pos[idx, 1])
+        if prof is not None:
+            prof.lap("coverage")
+
+        # ---------- Reward components ----------
+        # Battery penalty, plus collision penalty; dead drone penalty
+        step_rewards = np.full(len(ids), -1.0)
+        step_rewards[moving] = -0.01 - 0.2 * collided
 
         # ---------- Global coverage reward ----------
         new_coverage = self.coverage_grid.get_coverage_percentage()
         coverage_gain = new_coverage - prev_coverage
 
-        for i in rewards:
-            rewards[i] += 100.0 * coverage_gain   # shared team reward
-
-        done = (
-            self.current_step >= self.max_steps
-            or all(not d["active"] for d in self.drones)
-            or new_coverage >= self.scenario.coverage["target_percentage"]
-        )
-
-        self.last_rewards = rewards
+        step_rewards += 100.0 * coverage_gain   # shared team reward
+        self.last_reward_ids = ids
+        self.last_reward_values = step_rewards
 
-        return self._get_observations(), rewards, done, {}
+        done = self._done(new_coverage)
 
-    
-    def _get_observations(self):
-        observations = {}
-        radius = self.drone_model["sensing_radius"]
+        if prof is None:
+            self._observe(obs)
+            return done, {}
 
-        for i, d in enumerate(self.drones):
-            # Inactive drone → zero observation
-            if not d["active"]:
-                observations[i] = np.zeros(9, dtype=np.float32)
-                continue
+        prof.lap("reward")
+        self._observe(obs)
+        prof.lap("observation")
+        prof.stop()
 
-            x, y = d["x"], d["y"]
+        return done, {"profile": dict(prof.last)}
 
-            # ---------- Nearest drone ----------
-            ndx, ndy = 0.0, 0.0
-            min_dist = radius
-
-            for j, other in enumerate(self.drones):
-                if i == j or not other["active"]:
-                    continue
+    def _step_compiled(self, ids, act, obs):
+        """_step through the Numba kernels; same state and results."""
+        kernels = self._kernels
+        spec = self.spec
+        grid = self.coverage_grid
+        field = self.obstacle_field
+        state = self.battery.dtype.type
+        self.current_step += 1
 
-                dx = other["x"] - x
-                dy = other["y"] - y
-                dist = math.hypot(dx, dy)
+        k = len(ids)
+        rewards = np.empty(k)
+        moved = self._moved[:k]
+        direction = self._direction[:k]
+        n_new, collisions = kernels.step_kernel(
+            ids, act, self.pos, self.battery, self.active,
+            field.obstacles, field.start, field.candidates,
+            field.rows, field.cols, field.cell_width, field.cell_height,
+            grid.grid, grid.table, grid.covered_cells,
+            grid.cell_width, grid.cell_height,
+            float(self.width), float(self.height), float(spec.move_step),
+            state(spec.move_cost), float(spec.obstacle_radius),
+            rewards, moved, direction, self._new_cells
+        )
+        self.collisions += collisions
+        self.trails.push(self.pos)
+        grid.covered_cells += n_new
+        grid.last_new_cells = np.sort(self._new_cells[:n_new])
+
+        # np.arctan2, not the kernel's libm atan2, for bit-equal headings
+        self.heading[ids[moved]] = np.arctan2(
+            direction[moved, 1], direction[moved, 0]
+        )
 
-                if dist < min_dist:
-                    min_dist = dist
-                    ndx = dx / radius
-                    ndy = dy / radius
+        alive = np.flatnonzero(self.active)
+        index = self.neighbor_index
+        index.build(self.pos[alive], alive)
+        kernels.observe_kernel(
+            self.pos, self.heading, self.battery, self.active,
+            index.keys, index.points, index.ids, index.origin, index.stride,
+            field.obstacles, field.start, field.candidates,
+            field.rows, field.cols, field.cell_width, field.cell_height,
+            grid.table, grid.rows, grid.cols,
+            grid.cell_width, grid.cell_height, grid.cell_size,
+            float(spec.sensing_radius), spec.inv_sensing_radius,
+            spec.inv_width, spec.inv_height, state(spec.inv_max_battery),
+            state(math.pi), obs
+        )
 
-            # ---------- Nearest obstacle ----------
-            odx, ody = 0.0, 0.0
-            min_obs_dist = radius
+        self.last_reward_ids = ids
+        self.last_reward_values = rewards
+        return self._done(grid.get_coverage_percentage()), {}
 
-            for ox, oy in self.obstacles:
-                dx = ox - x
-                dy = oy - y
-                dist = math.hypot(dx, dy)
+    def _done(self, coverage):
+        return (
+            self.current_step >= self.max_steps
+            or not self.active.any()
+            or coverage >= self.spec.target_coverage
+        )
 
-                if dist < min_obs_dist:
-                    min_obs_dist = dist
-                    odx = dx / radius
-                    ody = dy / radius
+    @property
+    def last_rewards(self):
+        """Rewards of the latest step as {i: reward}."""
+        return dict(zip(
+            self.last_reward_ids.tolist(), self.last_reward_values.tolist()
+        ))
 
-            # ---------- Local coverage ----------
-            local_cov = self.coverage_grid.local_coverage(x, y, radius)
+    # -------------------------------------------------
+    def enable_profiling(self):
+        """Start per-phase step timings; returns the StepProfiler."""
+        if self.profiler is None:
+            self.profiler = StepProfiler()
+        return self.profiler
 
-            observations[i] = np.array([
-                x / self.width,
-                y / self.height,
-                d["heading"] / math.pi,
-                d["battery"] / self.drone_model["max_battery"],
+    def disable_profiling(self):
+        self.profiler = None
 
-                ndx,
-                ndy,
+    def profile_summary(self):
+        """StepProfiler.summary() of all profiled steps, or None when off."""
+        if self.profiler is None:
+            return None
+        return self.profiler.summary()
 
-                odx,
-                ody,
 
-                local_cov
-            ], dtype=np.float32)
+    def _get_observations(self):
+        obs = self._observe(
+            np.empty((self.num_drones, self.spec.obs_dim), dtype=np.float32)
+        )
+        return {i: obs[i] for i in range(self.num_drones)}
+
+    def _observe(self, out=None):
+        """Write the (N, obs_dim) observations into `out` and return it."""
+        if out is None:
+            out = self._obs
+        spec = self.spec
+        radius = spec.sensing_radius
+        active = self.active
+        pos = self.pos.astype(np.float64)
+        x, y = pos[:, 0], pos[:, 1]
+
+        # ---------- Nearest drone ----------
+        if self.neighbor_search == "hash":
+            ids = np.flatnonzero(active)
+            self.neighbor_index.build(pos[ids], ids)
+            nd = np.zeros((self.num_drones, 2))
+            nd[ids] = self.neighbor_index.nearest_within(pos[ids], radius, ids)
+        else:
+            nd = self._nearest(pos, pos, radius, exclude_self=True)
+
+        # ---------- Messages from neighbors ----------
+        if spec.message_dim:
+            inbox = self._message_inbox(pos, radius)
+
+        # ---------- Nearest obstacle ----------
+        offset, dist = self.obstacle_field.nearest(pos)
+        od = np.where(
+            (dist < radius)[:, None], offset * spec.inv_sensing_radius, 0.0
+        )
 
-        return observations
+        # ---------- Local coverage ----------
+        local_cov = self.coverage_grid.local_coverage_many(x, y, radius)
+
+        # Columns are computed in float64 and rounded once on assignment
+        out[:, 0] = x * spec.inv_width
+        out[:, 1] = y * spec.inv_height
+        out[:, 2] = self.heading / math.pi
+        out[:, 3] = self.battery * spec.inv_max_battery
+
+        out[:, 4:6] = nd
+
+        out[:, 6:8] = od
+
+        out[:, 8] = local_cov
+        if spec.message_dim:
+            out[:, 9:] = inbox
+
+        # Inactive drone → zero observation
+        out[~active] = 0.0
+
+        return out
+
+    def _message_inbox(self, pos, radius):
+        """
+        Mean message of the other active drones strictly within `radius` of
+        each drone; zeros when there are none. The hash search reuses the
+        index _get_observations just built over the active drones and sums
+        over neighbor pairs per receiver (SpatialHash.sum_within).
+        """
+        n = self.num_drones
+        inbox = np.zeros((n, self.message_dim))
+
+        if self.neighbor_search == "brute":
+            rel = pos[None, :, :] - pos[:, None, :]
+            within = np.hypot(rel[..., 0], rel[..., 1]) < radius
+            within &= self.active[None, :] & self.active[:, None]
+            np.fill_diagonal(within, False)
+            counts = within.sum(axis=1)
+            heard = counts > 0
+            inbox[heard] = (
+                within[heard] @ self.messages.astype(np.float64)
+            ) / counts[heard, None]
+            return inbox
+
+        ids = np.flatnonzero(self.active)
+        sums, counts = self.neighbor_index.sum_within(
+            pos[ids], radius, self.messages, ids
+        )
+        heard = counts > 0
+        inbox[ids[heard]] = sums[heard] / counts[heard, None]
+        return inbox
+
+    def _nearest(self, pos, targets, radius, exclude_self=False):
+        """
+        Offset to the closest target strictly within `radius` of each drone,
+        divided by `radius`; (0, 0) when there is none. Ties go to the lowest
+        target index.
+        """
+        rel = targets[None, :, :] - pos[:, None, :]
+        dist = np.hypot(rel[..., 0], rel[..., 1])
+
+        valid = dist < radius
+        if exclude_self:
+            valid &= self.active[None, :]
+            np.fill_diagonal(valid, False)
+
+        dist = np.where(valid, dist, np.inf)
+        out = np.zeros((len(pos), 2))
+        if dist.shape[1] == 0:
+            return out
+
+        j = dist.argmin(axis=1)
+        found = valid[np.arange(len(pos)), j]
+        out[found] = rel[found, j[found]] / radius
+        return out
+
+    def trail(self, i):
+        """Recent positions of drone i, oldest first."""
+        return self.trails.path(i)
 
     def random_actions(self):
+        if self.message_dim:
+            return {
+                i: tuple(random.uniform(-1, 1) for _ in range(self.act_dim))
+                for i in range(len(self.drones))
+            }
         return {
             i: (random.uniform(-1, 1), random.uniform(-1, 1))
             for i in range(len(self.drones))
@@ -0,0 +1,13 @@
+class NullRenderer:
+    """
+    Drop-in for PygameRenderer that draws nothing.
+
+    Used for headless runs: it has the same interface but never imports
+    pygame, needs no display and does not throttle the loop.
+    """
+
+    def __init__(self, scenario):
+        self.scenario = scenario
+
+    def draw(self, env):
+        pass
@@ -0,0 +1,145 @@
+import os
+import time
+
+
+PHASES = ("move", "collision", "battery", "coverage", "reward", "observation")
+
+
+class StepProfiler:
+    """
+    Wall time per phase of Environment.step.
+
+    The environment calls start() at the top of step() and lap(phase) at the
+    end of every phase; each lap is charged the time since the previous
+    mark. Timings of the latest step are in `last`, running totals in
+    `totals`.
+
+    capture() arms a window of steps that additionally run under cProfile
+    (and optionally tracemalloc); the results are written when the window
+    closes.
+    """
+
+    def __init__(self):
+        self.reset()
+        self._window = None
+
+    def reset(self):
+        self.steps = 0
+        self.totals = dict.fromkeys(PHASES, 0.0)
+        self.last = dict.fromkeys(PHASES, 0.0)
+        self._mark = 0.0
+
+    # -------------------------------------------------
+    def start(self):
+        if self._window is not None:
+            self._window_step()
+        self._mark = time.perf_counter()
+
+    def lap(self, phase):
+        now = time.perf_counter()
+        self.last[phase] = now - self._mark
+        self.totals[phase] += now - self._mark
+        self._mark = now
+
+    def stop(self):
+        self.steps += 1
+        if self._window is not None and self._window["profile"] is not None:
+            self._window["profile"].disable()
+            self._window["remaining"] -= 1
+            if self._window["remaining"] == 0:
+                self._close_window()
+
+    # -------------------------------------------------
+    def summary(self):
+        """
+        Per phase: total seconds, mean seconds per step and share of the
+        total step time, plus the number of steps profiled.
+        """
+        total = sum(self.totals.values())
+        phases = {
+            phase: {
+                "total_s": t,
+                "mean_s": t / self.steps if self.steps else 0.0,
+                "share": t / total if total > 0 else 0.0,
+            }
+            for phase, t in self.totals.items()
+        }
+        return {"steps": self.steps, "total_s": total, "phases": phases}
+
+    def format_summary(self):
+        s = self.summary()
+        lines = [f"{s['steps']} steps, {s['total_s']:.3f}s"]
+        for phase, p in s["phases"].items():
+            lines.append(
+                f"  {phase:<12} {p['mean_s'] * 1e6:9.1f}us/step "
+                f"{p['share']:6.1%}"
+            )
+        return "\n".join(lines)
+
+    # -------------------------------------------------
+    def capture(self, steps, path, memory=False):
+        """
+        Run the next `steps` calls of step() under cProfile and write the
+        stats to `path` (load with pstats). With `memory`, also trace
+        allocations over the window and write the top allocation sites to
+        `path` + ".mem.txt".
+        """
+        if steps <= 0:
+            raise ValueError(f"steps must be positive, got {steps}")
+        if self._window is not None:
+            raise RuntimeError("a capture window is already open")
+
+        self._window = {
+            "remaining": steps,
+            "path": path,
+            "memory": memory,
+            "profile": None,
+            "snapshot": None,
+        }
+
+    @property
+    def capturing(self):
+        return self._window is not None
+
+    def _window_step(self):
+        window = self._window
+        if window["profile"] is None:
+            # Imported here: only capture windows need them
+            import cProfile
+            import tracemalloc
+
+            window["profile"] = cProfile.Profile()
+            if window["memory"]:
+                if not tracemalloc.is_tracing():
+                    tracemalloc.start()
+                    window["started_tracing"] = True
+                window["snapshot"] = tracemalloc.take_snapshot()
+        window["profile"].enable()
+
+    def _close_window(self):
+        import cProfile
+        import tracemalloc
+
+        window, self._window = self._window, None
+        path = window["path"]
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        window["profile"].dump_stats(path)
+
+        if window["memory"]:
+            after = tracemalloc.take_snapshot()
+            if window.get("started_tracing"):
+                tracemalloc.stop()
+            # Leave out the profilers' own bookkeeping
+            ignore = [
+                tracemalloc.Filter(False, cProfile.__file__),
+                tracemalloc.Filter(False, tracemalloc.__file__),
+            ]
+            diff = after.filter_traces(ignore).compare_to(
+                window["snapshot"].filter_traces(ignore), "lineno"
+            )
+            with open(path + ".mem.txt", "w") as f:
+                for stat in diff[:50]:
+                    f.write(f"{stat}\n")
+
@@ -1,5 +1,6 @@
 import pygame
 import math
+import numpy as np
 import sys
 import time
 
@@ -9,6 +10,7 @@ class PygameRenderer:
         pygame.init()
 
         self.scenario = scenario
+        self.spec = spec = scenario.compile()
         self.scale = 8  # pixels per world unit
         self.paused = False
         self.show_sensing = True   # toggle for Module 2 visualization
@@ -17,17 +19,26 @@ class PygameRenderer:
         self.font = pygame.font.SysFont("arial", 14)
 
         # ---- Screen ----
-        self.width = int(scenario.world["width"] * self.scale)
-        self.height = int(scenario.world["height"] * self.scale)
+        self.width = int(spec.width * self.scale)
+        self.height = int(spec.height * self.scale)
 
         self.screen = pygame.display.set_mode((self.width, self.height))
         pygame.display.set_caption("Drone Swarm Simulation")
 
         self.clock = pygame.time.Clock()
+        self.fps = spec.render_fps
+
+        # ---- Coverage overlay cache ----
+        # Persistent surface holding exactly the cells in `coverage_drawn`;
+        # each frame only newly covered cells are painted onto it.
+        self.coverage_overlay = pygame.Surface(
+            (self.width, self.height), pygame.SRCALPHA
+        )
+        self.coverage_drawn = None
 
         # ---- Load map ----
         self.map = pygame.image.load(
-            scenario.map["image_path"]
+            spec.map_image_path
         ).convert()
         self.map = pygame.transform.scale(self.map, (self.width, self.height))
 
@@ -36,7 +47,7 @@ class PygameRenderer:
             "assests/drones/drone.png"   
         ).convert_alpha()
 
-        drone_size_world = scenario.drone_model["size"]
+        drone_size_world = spec.drone_size
         drone_size_px = int(drone_size_world * self.scale)
 
         self.drone_img = pygame.transform.smoothscale(
@@ -75,27 +86,12 @@ class PygameRenderer:
         self.screen.blit(self.map, (0, 0))
 
         # ---- Coverage overlay ----
-        grid = env.coverage_grid.grid
-        rows, cols = grid.shape
-        cell_w = self.width // cols
-        cell_h = self.height // rows
-
-        overlay = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
-
-        for r in range(rows):
-            for c in range(cols):
-                if grid[r, c]:
-                    pygame.draw.rect(
-                        overlay,
-                        (0, 255, 0, 60),
-                        (c * cell_w, r * cell_h, cell_w, cell_h)
-                    )
-
-        self.screen.blit(overlay, (0, 0))
+        self.update_coverage_overlay(env.coverage_grid.grid)
+        self.screen.blit(self.coverage_overlay, (0, 0))
 
         # ---- DEBUG: FORCE sensing visualization ----
         if self.show_sensing:
-            sensing_radius = self.scenario.drone_model["sensing_radius"]
+            sensing_radius = self.spec.sensing_radius
             sensing_px = int(sensing_radius * self.scale)
 
             for d in env.drones:
@@ -103,7 +99,7 @@ class PygameRenderer:
                     continue
 
                 x = int(d["x"] * self.scale)
-                y = int((self.scenario.world["height"] - d["y"]) * self.scale)
+                y = int((self.spec.height - d["y"]) * self.scale)
 
                 # BIG SOLID RED CIRCLE (IMPOSSIBLE TO MISS)
                 pygame.draw.circle(
@@ -126,7 +122,7 @@ class PygameRenderer:
             )
 
             x = int(d["x"] * self.scale)
-            y = int((self.scenario.world["height"] - d["y"]) * self.scale)
+            y = int((self.spec.height - d["y"]) * self.scale)
 
             rect = rotated.get_rect(center=(x, y))
             self.screen.blit(rotated, rect)
@@ -135,7 +131,7 @@ class PygameRenderer:
             self.draw_text(f"D{i}", x + 10, y - 12, (255, 255, 0))
 
             # Battery bar
-            b_ratio = d["battery"] / self.scenario.drone_model["max_battery"]
+            b_ratio = d["battery"] / self.spec.max_battery
             b_ratio = max(0.0, min(1.0, b_ratio))
 
             bar_w, bar_h = 22, 4
@@ -147,7 +143,7 @@ class PygameRenderer:
                 points = [
                     (
                         int(px * self.scale),
-                        int((self.scenario.world["height"] - py) * self.scale)
+                        int((self.spec.height - py) * self.scale)
                     )
                     for px, py in d["path"][-50:]
                 ]
@@ -226,36 +222,25 @@ class PygameRenderer:
             self.draw_text("PAUSED", self.width // 2 - 30, 20, (255, 80, 80))
 
         pygame.display.flip()
-        self.clock.tick(30)   # slower = easier to see learning
-
+        self.clock.tick(self.fps)
 
-        # ---- Sensing radius visualization (Module 2) ----
-        if self.show_sensing:
-            sensing_radius = self.scenario.drone_model["sensing_radius"]
-            sensing_px = int(sensing_radius * self.scale)
+    # -------------------------------------------------
+    def update_coverage_overlay(self, grid):
+        rows, cols = grid.shape
+        cell_w = self.width // cols
+        cell_h = self.height // rows
 
-            sensing_surface = pygame.Surface(
-                (self.width, self.height),
-                pygame.SRCALPHA
+        # First frame, or cells disappeared (env.reset): start again blank
+        drawn = self.coverage_drawn
+        if drawn is None or drawn.shape != grid.shape or (drawn & ~grid).any():
+            self.coverage_overlay.fill((0, 0, 0, 0))
+            self.coverage_drawn = drawn = np.zeros_like(grid)
+
+        for cell in np.flatnonzero(grid & ~drawn).tolist():
+            r, c = divmod(cell, cols)
+            self.coverage_overlay.fill(
+                (0, 255, 0, 60),
+                (c * cell_w, r * cell_h, cell_w, cell_h)
             )
 
-            for d in env.drones:
-                if not d["active"]:
-                    continue
-
-                x = int(d["x"] * self.scale)
-                y = int((self.scenario.world["height"] - d["y"]) * self.scale)
-
-                pygame.draw.circle(
-                    sensing_surface,
-                    (0, 120, 255, 50),   # blue transparent
-                    (x, y),
-                    sensing_px,
-                    2
-                )
-
-            self.screen.blit(sensing_surface, (0, 0))
-
-        
-
-
+        drawn[:] = grid
@@ -0,0 +1,212 @@
+"""
+Episode recording and replay.
+
+    python -m environment.recording recordings/episode_0000.npz --speed 2
+
+EpisodeRecorder copies the drone state arrays of an Environment after
+reset and after every step, plus the coverage cells each step added, and
+saves the episode as one compressed .npz. Replay rebuilds any step from
+that file, without simulating anything, as a frame PygameRenderer can draw.
+"""
+import argparse
+import json
+
+import numpy as np
+
+from environment.coverage_grid import CoverageGrid
+from environment.env import DroneView
+from environment.scenario_loader import Scenario
+
+
+class EpisodeRecorder:
+    """
+    Usage:
+        obs = env.reset(); recorder.start()
+        ... env.step(actions); recorder.record() ...
+        recorder.save(path)
+    """
+
+    def __init__(self, env):
+        self.env = env
+        self._allocate(env.max_steps + 1)
+        self.steps = 0
+
+    def _allocate(self, capacity):
+        n = self.env.num_drones
+        self.capacity = capacity
+        self.pos = np.zeros((capacity, n, 2), dtype=np.float32)
+        self.heading = np.zeros((capacity, n), dtype=np.float32)
+        self.battery = np.zeros((capacity, n), dtype=np.float32)
+        self.active = np.zeros((capacity, n), dtype=np.bool_)
+        self.rewards = np.zeros((capacity, n), dtype=np.float32)
+
+    def _grow(self):
+        old = (self.pos, self.heading, self.battery, self.active, self.rewards)
+        self._allocate(self.capacity * 2)
+        for new, arr in zip(
+            (self.pos, self.heading, self.battery, self.active, self.rewards),
+            old
+        ):
+            new[:len(arr)] = arr
+
+    def start(self):
+        """Begin a new episode; call right after env.reset()."""
+        env = self.env
+        self.steps = 0
+        self.obstacles = env.obstacles.copy()
+        self.new_cells = [
+            env.coverage_grid.covered_indices().astype(np.int32)
+        ]
+        self._capture(0)
+        self.rewards[0] = 0.0
+
+    def record(self):
+        """Capture the state after an env.step()."""
+        env = self.env
+        t = self.steps + 1
+        if t >= self.capacity:
+            self._grow()
+
+        self.new_cells.append(
+            env.coverage_grid.last_new_cells.astype(np.int32)
+        )
+        self._capture(t)
+
+        self.rewards[t] = 0.0
+        self.rewards[t, env.last_reward_ids] = env.last_reward_values
+        self.steps = t
+
+    def _capture(self, t):
+        env = self.env
+        self.pos[t] = env.pos
+        self.heading[t] = env.heading
+        self.battery[t] = env.battery
+        self.active[t] = env.active
+
+    def save(self, path):
+        frames = self.steps + 1
+        counts = np.array([len(c) for c in self.new_cells], dtype=np.int32)
+        np.savez_compressed(
+            path,
+            scenario=np.array(json.dumps(self.env.scenario.to_data())),
+            pos=self.pos[:frames],
+            heading=self.heading[:frames],
+            battery=self.battery[:frames],
+            active=self.active[:frames],
+            rewards=self.rewards[:frames],
+            obstacles=self.obstacles,
+            new_cells=np.concatenate(self.new_cells),
+            new_cell_counts=counts,
+        )
+
+
+# -------------------------------------------------
+class ReplayFrame:
+    """
+    One recorded step, shaped like an Environment as far as the renderers
+    are concerned (drones, coverage_grid, current_step, last_rewards).
+    """
+
+    def __init__(self, replay):
+        self.replay = replay
+        spec = replay.spec
+        self.num_drones = spec.num_drones
+        self.obstacles = replay.obstacles
+        self.coverage_grid = CoverageGrid.from_spec(spec)
+        self.drones = [DroneView(self, i) for i in range(self.num_drones)]
+        self.current_step = -1
+
+    def show(self, t):
+        r = self.replay
+        self.current_step = t
+        self.pos = r.pos[t]
+        self.heading = r.heading[t]
+        self.battery = r.battery[t]
+        self.active = r.active[t]
+        self.last_rewards = dict(enumerate(r.rewards[t].tolist()))
+
+        cg = self.coverage_grid
+        np.less_equal(r.covered_at, t, out=cg.grid.reshape(-1))
+        cg.covered_cells = int(r.covered_count[t])
+
+    def trail(self, i):
+        t = self.current_step
+        first = max(0, t - self.replay.trail_length + 1)
+        return self.replay.pos[first:t + 1, i]
+
+
+class Replay:
+    """
+    A saved episode. seek(t) returns the frame for step t (0 = after
+    reset); seeking is O(grid cells) in either direction.
+    """
+
+    def __init__(self, path):
+        with np.load(path) as data:
+            self.scenario = Scenario.from_data(json.loads(str(data["scenario"])))
+            self.pos = data["pos"]
+            self.heading = data["heading"]
+            self.battery = data["battery"]
+            self.active = data["active"]
+            self.rewards = data["rewards"]
+            self.obstacles = data["obstacles"]
+            new_cells = data["new_cells"]
+            counts = data["new_cell_counts"]
+
+        self.spec = self.scenario.compile()
+        self.trail_length = max(self.spec.trail_length, 1)
+        self.num_steps = len(self.pos) - 1
+
+        # Step at which each cell became covered (past the end = never)
+        self.covered_at = np.full(
+            self.spec.grid_cells, len(self.pos), dtype=np.int32
+        )
+        self.covered_at[new_cells] = np.repeat(
+            np.arange(len(counts), dtype=np.int32), counts
+        )
+        self.covered_count = np.cumsum(counts)
+
+        self.frame = ReplayFrame(self)
+
+    def seek(self, t):
+        t = int(min(max(t, 0), self.num_steps))
+        self.frame.show(t)
+        return self.frame
+
+
+def play(path, speed=1.0, start=0, loop=False, fps=None):
+    """
+    Draw a recording with PygameRenderer, `speed` recorded steps per frame
+    (fractions slow it down). SPACE pauses as in a live run.
+    """
+    from environment.pygame_renderer import PygameRenderer
+
+    replay = Replay(path)
+    renderer = PygameRenderer(replay.scenario)
+    if fps is not None:
+        renderer.fps = fps
+
+    t = float(start)
+    while True:
+        renderer.draw(replay.seek(t))
+        if renderer.paused:
+            continue
+
+        t += speed
+        if t > replay.num_steps:
+            if not loop:
+                break
+            t = 0.0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay a recorded episode")
+    parser.add_argument("path")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="recorded steps per frame")
+    parser.add_argument("--start", type=int, default=0, metavar="STEP")
+    parser.add_argument("--loop", action="store_true")
+    parser.add_argument("--fps", type=int, default=None)
+    args = parser.parse_args()
+
+    play(args.path, args.speed, args.start, args.loop, args.fps)
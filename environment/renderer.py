@@ -6,19 +6,20 @@ from matplotlib.transforms import Affine2D
 class EnvironmentRenderer:
     def __init__(self, scenario):
         self.scenario = scenario
+        self.spec = spec = scenario.compile()
         plt.ion()
 
         self.fig, self.ax = plt.subplots(figsize=(8, 8))
-        self.ax.set_xlim(0, scenario.world["width"])
-        self.ax.set_ylim(0, scenario.world["height"])
+        self.ax.set_xlim(0, spec.width)
+        self.ax.set_ylim(0, spec.height)
         self.ax.set_xticks([])
         self.ax.set_yticks([])
 
         # ---- Load real map image ----
-        self.map_img = mpimg.imread(scenario.map["image_path"])
+        self.map_img = mpimg.imread(spec.map_image_path)
         self.ax.imshow(
             self.map_img,
-            extent=[0, scenario.world["width"], 0, scenario.world["height"]],
+            extent=[0, spec.width, 0, spec.height],
             origin="lower"
         )
 
@@ -26,7 +27,7 @@ class EnvironmentRenderer:
         self.drone_artists = []
 
         self.drone_cache = []
-        for _ in range(scenario.drones["count"]):
+        for _ in range(spec.num_drones):
             img = self.ax.imshow(
                 self.drone_img,
                 extent=[0,0,0,0],
@@ -66,4 +67,4 @@ class EnvironmentRenderer:
         self.ax.set_title(
             f"Coverage: {env.coverage_grid.get_coverage_percentage():.2%}"
         )
-        plt.pause(1 / self.scenario.simulation["render_fps"])
+        plt.pause(1 / self.spec.render_fps)
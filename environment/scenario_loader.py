@@ -1,39 +1,272 @@
+import copy
 import yaml
 import os
 
+
+class _UniqueKeyLoader(yaml.SafeLoader):
+    """SafeLoader that rejects mappings with the same key twice."""
+
+    def construct_mapping(self, node, deep=False):
+        seen = set()
+        for key_node, _ in node.value:
+            key = self.construct_object(key_node, deep=deep)
+            if key in seen:
+                raise ValueError(
+                    f"Duplicate key '{key}' in {node.start_mark.name}, "
+                    f"line {key_node.start_mark.line + 1}"
+                )
+            seen.add(key)
+        return super().construct_mapping(node, deep=deep)
+
+
+def _load_yaml(path):
+    with open(path, "r") as f:
+        return yaml.load(f, Loader=_UniqueKeyLoader)
+
+
+# Parsed files by absolute path: (scenario mtime, drone model mtime, data)
+_cache = {}
+
+
+def clear_cache():
+    _cache.clear()
+
+
+def _parse(path):
+    path = os.path.abspath(path)
+    base_dir = os.path.dirname(path)
+    mtime = os.stat(path).st_mtime_ns
+
+    cached = _cache.get(path)
+    if cached is not None and cached[0] == mtime:
+        drone_model_path, model_mtime = cached[1]
+        try:
+            fresh = os.stat(drone_model_path).st_mtime_ns == model_mtime
+        except FileNotFoundError:
+            fresh = False
+        if fresh:
+            return cached[2]
+
+    data = _load_yaml(path)
+
+    required = [
+        "world", "map", "drone_model",
+        "drones", "coverage",
+        "obstacles", "simulation"
+    ]
+    for key in required:
+        if key not in data:
+            raise ValueError(f"Missing '{key}' in scenario.yaml")
+
+    # ✅ Resolve drone_model path relative to scenario.yaml
+    drone_model_path = os.path.join(base_dir, data["drone_model"])
+
+    if not os.path.exists(drone_model_path):
+        raise FileNotFoundError(f"Drone model not found: {drone_model_path}")
+
+    model = _load_yaml(drone_model_path)
+
+    if "drone" not in model:
+        raise ValueError("drone_model.yaml must contain 'drone' block")
+
+    data["drone_model"] = model["drone"]
+    model_mtime = os.stat(drone_model_path).st_mtime_ns
+    _cache[path] = (mtime, (drone_model_path, model_mtime), data)
+    return data
+
+
 class Scenario:
+    """
+    Scenario YAML plus its drone model, as plain dicts.
+
+    Parsed files are cached by path and modification time, so loading the
+    same scenario again only copies the dicts. Each Scenario gets its own
+    copy and may be edited freely; compile() turns the current contents
+    into a validated, immutable CompiledScenario.
+    """
+
     def __init__(self, path):
-        base_dir = os.path.dirname(os.path.abspath(path))
+        self._set(copy.deepcopy(_parse(path)))
 
-        with open(path, "r") as f:
-            data = yaml.safe_load(f)
+    @classmethod
+    def from_data(cls, data):
+        """
+        Scenario from already-parsed sections (as returned by to_data()),
+        e.g. one stored alongside a recording.
+        """
+        scenario = cls.__new__(cls)
+        scenario._set(copy.deepcopy(data))
+        return scenario
 
-        required = [
-            "world", "map", "drone_model",
-            "drones", "coverage",
-            "obstacles", "simulation"
-        ]
-        for key in required:
-            if key not in data:
-                raise ValueError(f"Missing '{key}' in scenario.yaml")
+    def to_data(self):
+        return copy.deepcopy({
+            "world": self.world,
+            "map": self.map,
+            "drones": self.drones,
+            "coverage": self.coverage,
+            "obstacles": self.obstacles,
+            "simulation": self.simulation,
+            "communication": self.communication,
+            "drone_model": self.drone_model,
+        })
 
+    def _set(self, data):
         self.world = data["world"]
         self.map = data["map"]
         self.drones = data["drones"]
         self.coverage = data["coverage"]
         self.obstacles = data["obstacles"]
         self.simulation = data["simulation"]
+        self.communication = data.get("communication") or {}
+        self.drone_model = data["drone_model"]
+
+    def compile(self):
+        return CompiledScenario(self)
+
+
+def _number(section, block, key, positive=True, default=None):
+    if key not in block:
+        if default is not None:
+            return float(default)
+        raise ValueError(f"Missing '{section}.{key}' in scenario")
+
+    value = block[key]
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"'{section}.{key}' must be a number, got {value!r}")
+    if positive and not value > 0:
+        raise ValueError(f"'{section}.{key}' must be positive, got {value!r}")
+    return float(value)
+
+
+def _count(section, block, key, minimum=1, default=None):
+    value = block.get(key, default)
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise ValueError(f"'{section}.{key}' must be an integer, got {value!r}")
+    if value < minimum:
+        raise ValueError(f"'{section}.{key}' must be >= {minimum}, got {value}")
+    return value
+
+
+class CompiledScenario:
+    """
+    Immutable, validated snapshot of a Scenario with typed fields and the
+    derived constants the simulation needs every step, so hot loops read
+    plain attributes instead of nested dict lookups.
+    """
+
+    __slots__ = (
+        # ---- World ----
+        "width", "height", "inv_width", "inv_height", "map_image_path",
+        # ---- Drones ----
+        "num_drones", "max_battery", "inv_max_battery", "move_step",
+        "move_cost", "drone_size", "sensing_radius", "inv_sensing_radius",
+        # ---- Coverage ----
+        "grid_rows", "grid_cols", "grid_cells", "cell_width", "cell_height",
+        "cell_size", "target_coverage", "coverage_backend",
+        "coverage_tile_size",
+        # ---- Obstacles ----
+        "obstacles_enabled", "num_obstacles", "obstacle_radius",
+        "field_resolution",
+        # ---- Communication ----
+        "message_dim", "obs_dim", "act_dim",
+        # ---- Simulation ----
+        "max_steps", "render_fps", "trail_length", "step_backend",
+    )
+
+    def __init__(self, scenario):
+        s = object.__setattr__
+        world = scenario.world
+        model = scenario.drone_model
+        coverage = scenario.coverage
+        obstacles = scenario.obstacles
+        simulation = scenario.simulation
+
+        # ---- World ----
+        width = _number("world", world, "width")
+        height = _number("world", world, "height")
+        s(self, "width", width)
+        s(self, "height", height)
+        s(self, "inv_width", 1.0 / width)
+        s(self, "inv_height", 1.0 / height)
+        s(self, "map_image_path", scenario.map.get("image_path"))
+
+        # ---- Drones ----
+        s(self, "num_drones", _count("drones", scenario.drones, "count"))
+        max_battery = _number("drone", model, "max_battery")
+        s(self, "max_battery", max_battery)
+        s(self, "inv_max_battery", 1.0 / max_battery)
+        s(self, "move_step", _number("drone", model, "move_step"))
+        s(self, "move_cost", _number("drone", model, "move_cost", False))
+        s(self, "drone_size", _number("drone", model, "size"))
+        radius = _number("drone", model, "sensing_radius")
+        s(self, "sensing_radius", radius)
+        s(self, "inv_sensing_radius", 1.0 / radius)
+
+        # ---- Coverage ----
+        rows = _count("coverage", coverage, "grid_rows")
+        cols = _count("coverage", coverage, "grid_cols")
+        s(self, "grid_rows", rows)
+        s(self, "grid_cols", cols)
+        s(self, "grid_cells", rows * cols)
+        s(self, "cell_width", width / cols)
+        s(self, "cell_height", height / rows)
+        s(self, "cell_size", min(width / cols, height / rows))
+        s(self, "target_coverage",
+          _number("coverage", coverage, "target_percentage"))
+
+        backend = coverage.get("backend", "dense")
+        if backend not in ("dense", "tiled"):
+            raise ValueError(
+                f"'coverage.backend' must be 'dense' or 'tiled', got {backend!r}"
+            )
+        tile_size = _count("coverage", coverage, "tile_size", 8, default=128)
+        if tile_size % 8:
+            raise ValueError(
+                f"'coverage.tile_size' must be a multiple of 8, got {tile_size}"
+            )
+        s(self, "coverage_backend", backend)
+        s(self, "coverage_tile_size", tile_size)
+
+        # ---- Obstacles ----
+        enabled = bool(obstacles.get("enabled", False))
+        s(self, "obstacles_enabled", enabled)
+        s(self, "num_obstacles",
+          _count("obstacles", obstacles, "count", 0) if enabled else 0)
+        obstacle_radius = _number("obstacles", obstacles, "radius")
+        s(self, "obstacle_radius", obstacle_radius)
+        s(self, "field_resolution",
+          _number("obstacles", obstacles, "field_resolution", default=1.0))
+
+        # ---- Communication ----
+        # Each drone emits `message_dim` values with its action and observes
+        # the mean message of its neighbors (0 = no channel)
+        message_dim = _count("communication", scenario.communication,
+                             "message_dim", 0, default=0)
+        s(self, "message_dim", message_dim)
+        s(self, "obs_dim", 9 + message_dim)
+        s(self, "act_dim", 2 + message_dim)
 
-        # ✅ Resolve drone_model path relative to scenario.yaml
-        drone_model_path = os.path.join(base_dir, data["drone_model"])
+        # ---- Simulation ----
+        s(self, "max_steps", _count("simulation", simulation, "max_steps"))
+        s(self, "render_fps",
+          _number("simulation", simulation, "render_fps", default=60))
+        s(self, "trail_length",
+          _count("simulation", simulation, "trail_length", 0, default=50))
 
-        if not os.path.exists(drone_model_path):
-            raise FileNotFoundError(f"Drone model not found: {drone_model_path}")
+        step_backend = simulation.get("step_backend", "numpy")
+        if step_backend not in ("numpy", "numba"):
+            raise ValueError(
+                f"'simulation.step_backend' must be 'numpy' or 'numba', "
+                f"got {step_backend!r}"
+            )
+        s(self, "step_backend", step_backend)
 
-        with open(drone_model_path, "r") as f:
-            model = yaml.safe_load(f)
+    def __setattr__(self, name, value):
+        raise AttributeError("CompiledScenario is immutable")
 
-        if "drone" not in model:
-            raise ValueError("drone_model.yaml must contain 'drone' block")
+    def __delattr__(self, name):
+        raise AttributeError("CompiledScenario is immutable")
 
-        self.drone_model = model["drone"]
+    def __repr__(self):
+        fields = ", ".join(f"{k}={getattr(self, k)!r}" for k in self.__slots__)
+        return f"CompiledScenario({fields})"
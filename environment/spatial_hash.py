@@ -0,0 +1,188 @@
+import numpy as np
+
+
+# The 3x3 block of cells around a query cell: with cell_size >= radius,
+# every point within radius of the query lies in one of these cells.
+_NEIGHBOR_CELLS = np.array(
+    [(dx, dy) for dy in (-1, 0, 1) for dx in (-1, 0, 1)], dtype=np.int64
+)
+
+
+class SpatialHash:
+    """
+    Uniform-grid spatial hash over 2D points for batched radius queries.
+
+    build() buckets the points by cell (one sort); nearest_within() and
+    pairs_within() then check only the 3x3 cells around each query instead
+    of every point, which is exact as long as the query radius is at most
+    `cell_size`.
+    Candidate pairs are processed in chunks of at most `max_pairs` to keep
+    memory bounded on dense swarms.
+    """
+
+    def __init__(self, cell_size, max_pairs=1 << 21):
+        self.cell_size = float(cell_size)
+        self.max_pairs = max_pairs
+
+        self.points = np.zeros((0, 2))
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.keys = np.zeros(0, dtype=np.int64)
+        self.origin = np.zeros(2, dtype=np.int64)
+        self.stride = 1
+
+    def _cells(self, points):
+        return np.floor(points / self.cell_size).astype(np.int64)
+
+    def build(self, points, ids=None):
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        if ids is None:
+            ids = np.arange(len(points))
+
+        cells = self._cells(points)
+        if len(points):
+            # One empty cell of margin on every side keeps neighbor keys valid
+            self.origin = cells.min(axis=0) - 1
+            cells = cells - self.origin
+            self.stride = int(cells[:, 0].max()) + 2
+        keys = cells[:, 1] * self.stride + cells[:, 0]
+
+        order = np.argsort(keys, kind="stable")
+        self.keys = keys[order]
+        self.points = points[order]
+        self.ids = np.asarray(ids, dtype=np.int64)[order]
+
+    def nearest_within(self, queries, radius, query_ids=None):
+        """
+        For each query, the offset to the closest built point strictly
+        within `radius`, divided by `radius`; (0, 0) when there is none.
+        Points whose id equals the query's id are skipped. Ties go to the
+        lowest id, as in a brute-force scan.
+        """
+        queries = np.asarray(queries, dtype=np.float64).reshape(-1, 2)
+        out = np.zeros((len(queries), 2))
+        if len(queries) == 0 or len(self.keys) == 0:
+            return out
+        if query_ids is None:
+            query_ids = np.full(len(queries), -1, dtype=np.int64)
+
+        for qi, cj in self._candidates(queries):
+            self._nearest_chunk(queries, query_ids, radius, qi, cj, out)
+        return out
+
+    def pairs_within(self, queries, radius, query_ids=None):
+        """
+        All (query, point) pairs strictly within `radius`, skipping points
+        whose id equals the query's id. Returns (query index, point id)
+        arrays sorted by query index, i.e. the neighbor lists of every
+        query in CSR order.
+        """
+        queries = np.asarray(queries, dtype=np.float64).reshape(-1, 2)
+        empty = np.zeros(0, dtype=np.int64)
+        if len(queries) == 0 or len(self.keys) == 0:
+            return empty, empty
+        if query_ids is None:
+            query_ids = np.full(len(queries), -1, dtype=np.int64)
+
+        found_q, found_ids = [empty], [empty]
+        for qi, cj in self._candidates(queries):
+            rel = self.points[cj] - queries[qi]
+            ids = self.ids[cj]
+            valid = (
+                (np.hypot(rel[:, 0], rel[:, 1]) < radius)
+                & (ids != query_ids[qi])
+            )
+            found_q.append(qi[valid])
+            found_ids.append(ids[valid])
+
+        return np.concatenate(found_q), np.concatenate(found_ids)
+
+    def sum_within(self, queries, radius, values, query_ids=None):
+        """
+        Per query, the sum of values[id] over the points strictly within
+        `radius` (same id skipped, as in pairs_within) and their count.
+        `values` is indexed by point id, shaped (ids, k). Reduced chunk by
+        chunk, so memory stays bounded however many pairs there are.
+        """
+        queries = np.asarray(queries, dtype=np.float64).reshape(-1, 2)
+        values = np.asarray(values, dtype=np.float64)
+        sums = np.zeros((len(queries),) + values.shape[1:])
+        counts = np.zeros(len(queries), dtype=np.int64)
+        if len(queries) == 0 or len(self.keys) == 0:
+            return sums, counts
+        if query_ids is None:
+            query_ids = np.full(len(queries), -1, dtype=np.int64)
+
+        for qi, cj in self._candidates(queries):
+            rel = self.points[cj] - queries[qi]
+            ids = self.ids[cj]
+            valid = (
+                (np.hypot(rel[:, 0], rel[:, 1]) < radius)
+                & (ids != query_ids[qi])
+            )
+            qi, ids = qi[valid], ids[valid]
+            if len(qi) == 0:
+                continue
+
+            # Pairs are grouped by query and no query spans two chunks
+            starts = np.flatnonzero(np.r_[True, qi[1:] != qi[:-1]])
+            sums[qi[starts]] = np.add.reduceat(values[ids], starts, axis=0)
+            counts[qi[starts]] = np.diff(np.r_[starts, len(qi)])
+
+        return sums, counts
+
+    def _candidates(self, queries):
+        """
+        Yield (query index, sorted point index) candidate pairs from the
+        3x3 cells around each query, grouped by query, in chunks of at
+        most about `max_pairs` pairs.
+        """
+        # ---- Candidate ranges in the sorted point list ----
+        cells = (self._cells(queries) - self.origin)[:, None, :]
+        cells = cells + _NEIGHBOR_CELLS[None, :, :]           # (Q, 9, 2)
+        inside = (cells[..., 0] >= 0) & (cells[..., 0] < self.stride)
+        keys = cells[..., 1] * self.stride + cells[..., 0]
+
+        start = np.searchsorted(self.keys, keys, side="left")
+        counts = np.searchsorted(self.keys, keys, side="right") - start
+        counts[~inside] = 0
+
+        # ---- Chunks of queries with a bounded number of pairs ----
+        per_query = np.cumsum(counts.sum(axis=1))
+        lo = 0
+        while lo < len(queries):
+            base = per_query[lo - 1] if lo else 0
+            hi = int(np.searchsorted(per_query, base + self.max_pairs, "right"))
+            hi = max(hi, lo + 1)
+
+            chunk = counts[lo:hi].ravel()
+            total = int(chunk.sum())
+            if total:
+                # Expand each (query, cell) range into explicit pairs
+                qi = np.repeat(np.repeat(np.arange(lo, hi), 9), chunk)
+                first = np.repeat(np.cumsum(chunk) - chunk, chunk)
+                cj = (np.repeat(start[lo:hi].ravel(), chunk)
+                      + np.arange(total) - first)
+                yield qi, cj
+            lo = hi
+
+    def _nearest_chunk(self, queries, query_ids, radius, qi, cj, out):
+        rel = self.points[cj] - queries[qi]
+        dist = np.hypot(rel[:, 0], rel[:, 1])
+        ids = self.ids[cj]
+
+        valid = (dist < radius) & (ids != query_ids[qi])
+        qi, rel, dist, ids = qi[valid], rel[valid], dist[valid], ids[valid]
+        if len(qi) == 0:
+            return
+
+        # Closest (then lowest id) candidate per query; pairs are already
+        # grouped by query, so segment reductions replace a sort
+        starts = np.flatnonzero(np.r_[True, qi[1:] != qi[:-1]])
+        lengths = np.diff(np.r_[starts, len(qi)])
+
+        best = np.repeat(np.minimum.reduceat(dist, starts), lengths)
+        tied_ids = np.where(dist == best, ids, np.iinfo(np.int64).max)
+        best_id = np.repeat(np.minimum.reduceat(tied_ids, starts), lengths)
+        pick = tied_ids == best_id
+
+        out[qi[pick]] = rel[pick] / radius
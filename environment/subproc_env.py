@@ -0,0 +1,235 @@
+import random
+import traceback
+import multiprocessing as mp
+from multiprocessing import shared_memory
+from multiprocessing.connection import wait
+
+import numpy as np
+
+from environment.env import Environment
+
+
+class WorkerError(RuntimeError):
+    """A rollout worker raised, died or stopped answering."""
+
+
+def _attach(specs):
+    blocks, arrays = [], {}
+    for key, (name, shape, dtype) in specs.items():
+        shm = shared_memory.SharedMemory(name=name)
+        blocks.append(shm)
+        arrays[key] = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+    return blocks, arrays
+
+
+def _worker(scenario, lo, hi, seed, specs, conn):
+    blocks, arrays = _attach(specs)
+    obs_buf = arrays["obs"]
+    actions = arrays["actions"]
+    rewards_buf = arrays["rewards"]
+    dones_buf = arrays["dones"]
+
+    try:
+        # Environment draws layouts from `random`
+        random.seed(seed)
+        np.random.seed(seed % 2**32)
+
+        envs = [Environment(scenario) for _ in range(lo, hi)]
+
+        while True:
+            cmd = conn.recv()
+
+            if cmd == "reset":
+                for j, env in zip(range(lo, hi), envs):
+                    env.reset_arrays(obs_buf[j])
+                conn.send(("ok", []))
+
+            elif cmd == "step":
+                infos = []
+                for j, env in zip(range(lo, hi), envs):
+                    # Results land straight in the shared arrays
+                    _, _, _, done, _ = env.step_arrays(
+                        actions[j], obs=obs_buf[j], rewards=rewards_buf[j]
+                    )
+                    dones_buf[j] = done
+
+                    # Automatic reset; report the finished episode
+                    if done:
+                        infos.append({
+                            "env": j,
+                            "steps": env.current_step,
+                            "coverage": env.coverage_grid.get_coverage_percentage(),
+                        })
+                        env.reset_arrays(obs_buf[j])
+                conn.send(("ok", infos))
+
+            elif cmd == "close":
+                break
+
+    except (KeyboardInterrupt, EOFError):
+        pass
+    except Exception:
+        conn.send(("error", traceback.format_exc()))
+    finally:
+        for shm in blocks:
+            shm.close()
+        conn.close()
+
+
+class SubprocVecEnv:
+    """
+    Environments stepped in worker processes, results in shared memory.
+
+    Each of `num_workers` processes owns `envs_per_worker` Environments.
+    Actions are written into a shared (E, N, act_dim) array and every worker
+    writes observations (E, N, obs_dim), rewards (E, N) and done flags (E,)
+    straight into shared arrays, so only a one-word command and a short
+    list of finished-episode infos cross the pipes. Finished environments
+    are reset by their worker.
+
+    reset()/step() return the shared arrays themselves; they are
+    overwritten by the next step, so copy anything you want to keep.
+    """
+
+    def __init__(self, scenario, num_workers, envs_per_worker=1, seed=0,
+                 start_method=None, timeout=60.0):
+        self.num_workers = num_workers
+        self.num_envs = num_workers * envs_per_worker
+        spec = scenario.compile()
+        self.num_drones = spec.num_drones
+        self.timeout = timeout
+
+        E, N = self.num_envs, self.num_drones
+        layout = {
+            "obs": ((E, N, spec.obs_dim), np.float32),
+            "actions": ((E, N, spec.act_dim), np.float32),
+            "rewards": ((E, N), np.float32),
+            "dones": ((E,), np.bool_),
+        }
+
+        self._blocks = []
+        specs = {}
+        arrays = {}
+        for key, (shape, dtype) in layout.items():
+            size = max(1, int(np.prod(shape)) * np.dtype(dtype).itemsize)
+            shm = shared_memory.SharedMemory(create=True, size=size)
+            self._blocks.append(shm)
+            specs[key] = (shm.name, shape, dtype)
+            arrays[key] = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+            arrays[key][...] = 0
+
+        self.obs = arrays["obs"]
+        self.actions = arrays["actions"]
+        self.rewards = arrays["rewards"]
+        self.dones = arrays["dones"]
+
+        # ---- Workers (seed + worker index each) ----
+        ctx = mp.get_context(start_method)
+        self._conns = []
+        self._procs = []
+        for w in range(num_workers):
+            parent, child = ctx.Pipe()
+            lo = w * envs_per_worker
+            proc = ctx.Process(
+                target=_worker,
+                args=(scenario, lo, lo + envs_per_worker,
+                      seed + w, specs, child),
+                daemon=True,
+            )
+            proc.start()
+            child.close()
+            self._conns.append(parent)
+            self._procs.append(proc)
+
+        self.closed = False
+
+    # -------------------------------------------------
+    def _broadcast(self, cmd):
+        for w, conn in enumerate(self._conns):
+            try:
+                conn.send(cmd)
+            except (BrokenPipeError, OSError):
+                raise self._crashed(w, "pipe closed")
+
+    def _gather(self):
+        infos = []
+        pending = dict(enumerate(self._conns))
+
+        while pending:
+            ready = wait(list(pending.values()), timeout=self.timeout)
+            if not ready:
+                w = next(iter(pending))
+                dead = [i for i in pending if not self._procs[i].is_alive()]
+                raise self._crashed(
+                    dead[0] if dead else w,
+                    "exited" if dead else f"no reply in {self.timeout}s"
+                )
+
+            for w, conn in list(pending.items()):
+                if conn not in ready:
+                    continue
+                try:
+                    status, payload = conn.recv()
+                except (EOFError, OSError):
+                    raise self._crashed(w, "exited")
+                if status == "error":
+                    raise self._crashed(w, "raised:\n" + payload)
+                infos.extend(payload)
+                del pending[w]
+
+        return infos
+
+    def _crashed(self, w, reason):
+        proc = self._procs[w]
+        proc.join(timeout=0.1)
+        self.close()
+        return WorkerError(
+            f"rollout worker {w} {reason} (exit code {proc.exitcode})"
+        )
+
+    # -------------------------------------------------
+    def reset(self):
+        self._broadcast("reset")
+        self._gather()
+        return self.obs
+
+    def step(self, actions):
+        """
+        actions: (E, N, act_dim). Returns (obs, rewards, dones, infos) where infos
+        lists {"env", "steps", "coverage"} for every episode that ended.
+        """
+        self.actions[...] = actions
+        self._broadcast("step")
+        infos = self._gather()
+        return self.obs, self.rewards, self.dones, infos
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+
+        for conn in self._conns:
+            try:
+                conn.send("close")
+            except (BrokenPipeError, OSError):
+                pass
+        for proc in self._procs:
+            proc.join(timeout=1.0)
+            if proc.is_alive():
+                proc.terminate()
+        for conn in self._conns:
+            conn.close()
+
+        self.obs = self.actions = self.rewards = self.dones = None
+        for shm in self._blocks:
+            try:
+                shm.close()
+            except BufferError:
+                pass    # caller still holds a view; freed with it
+            shm.unlink()
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
@@ -0,0 +1,33 @@
+import numpy as np
+
+
+class TrailBuffer:
+    """
+    The last `length` positions of every drone in a fixed (length, N, 2)
+    ring, so trails cost one row write per step and never grow.
+    """
+
+    def __init__(self, num_drones, length, dtype=np.float32):
+        self.length = length
+        self.points = np.zeros((max(length, 1), num_drones, 2), dtype=dtype)
+        self.head = 0     # next row to write
+        self.count = 0
+
+    def clear(self):
+        self.head = 0
+        self.count = 0
+
+    def push(self, pos):
+        if self.length == 0:
+            return
+        self.points[self.head] = pos
+        self.head = (self.head + 1) % self.length
+        self.count = min(self.count + 1, self.length)
+
+    def path(self, i):
+        """Positions of drone i, oldest first, as a (k, 2) array."""
+        if self.count < self.length:
+            return self.points[:self.count, i]
+        return np.concatenate(
+            (self.points[self.head:, i], self.points[:self.head, i])
+        )
@@ -0,0 +1,286 @@
+import numpy as np
+
+
+class VecEnvironment:
+    """
+    B independent copies of `Environment` (same scenario) stepped together.
+
+    All state is held in stacked arrays with a leading world axis, so one
+    call to step() advances every world with a handful of NumPy operations.
+    Worlds that finish are reset automatically.
+    """
+
+    def __init__(self, scenario, num_envs, seed=None):
+        self.scenario = scenario
+        self.num_envs = num_envs
+        spec = scenario.compile()
+        if spec.message_dim:
+            raise ValueError(
+                "VecEnvironment has no message channel; use Environment or "
+                "SubprocVecEnv with communication.message_dim > 0"
+            )
+
+        # ---- Drone model ----
+        self.drone_model = scenario.drone_model
+        self.num_drones = spec.num_drones
+        self.move_step = spec.move_step
+        self.move_cost = spec.move_cost
+        self.max_battery = spec.max_battery
+        self.sensing_radius = spec.sensing_radius
+
+        # ---- World ----
+        self.width = spec.width
+        self.height = spec.height
+
+        # ---- Obstacles ----
+        self.num_obstacles = spec.num_obstacles
+        self.obstacle_radius = spec.obstacle_radius
+
+        # ---- Coverage grid (same cell mapping as CoverageGrid) ----
+        self.grid_rows = spec.grid_rows
+        self.grid_cols = spec.grid_cols
+        self.cell_width = spec.cell_width
+        self.cell_height = spec.cell_height
+        self.cell_size = spec.cell_size
+        self.grid_size = spec.grid_cells
+        self.target_coverage = spec.target_coverage
+
+        # ---- Simulation ----
+        self.max_steps = spec.max_steps
+
+        self.rng = np.random.default_rng(seed)
+
+        B, N, M = num_envs, self.num_drones, self.num_obstacles
+        self.pos = np.zeros((B, N, 2), dtype=np.float64)
+        self.heading = np.zeros((B, N), dtype=np.float64)
+        self.battery = np.zeros((B, N), dtype=np.float64)
+        self.active = np.zeros((B, N), dtype=np.bool_)
+        self.obstacles = np.zeros((B, M, 2), dtype=np.float64)
+        self.grid = np.zeros(
+            (B, self.grid_rows, self.grid_cols), dtype=np.bool_
+        )
+        self.covered_cells = np.zeros(B, dtype=np.int64)
+        # col_prefix[b, c, r] = covered cells of column c above row r,
+        # kept up to date by _mark_covered so window sums need no scan.
+        self.col_prefix = np.zeros(
+            (B, self.grid_cols, self.grid_rows + 1), dtype=np.int32
+        )
+        self.current_step = np.zeros(B, dtype=np.int64)
+
+    # -------------------------------------------------
+    def reset(self):
+        self._reset_worlds(np.arange(self.num_envs))
+        return self._get_observations()
+
+    def _reset_worlds(self, worlds):
+        n = len(worlds)
+        if n == 0:
+            return
+
+        self.current_step[worlds] = 0
+
+        # ---- Obstacles ----
+        if self.num_obstacles:
+            low = np.array([10.0, 10.0])
+            high = np.array([self.width - 10.0, self.height - 10.0])
+            self.obstacles[worlds] = self.rng.uniform(
+                low, high, size=(n, self.num_obstacles, 2)
+            )
+
+        # ---- Drones ----
+        self.pos[worlds] = self.rng.uniform(
+            0.0, [self.width, self.height], size=(n, self.num_drones, 2)
+        )
+        self.heading[worlds] = 0.0
+        self.battery[worlds] = self.max_battery
+        self.active[worlds] = True
+
+        # ---- Coverage ----
+        self.grid[worlds] = False
+        self.covered_cells[worlds] = 0
+        self.col_prefix[worlds] = 0
+        self._mark_covered(worlds, np.ones((n, self.num_drones), np.bool_))
+
+    # -------------------------------------------------
+    def step(self, actions):
+        """
+        actions: (B, N, 2) array of raw (dx, dy) per drone.
+
+        Returns (obs (B, N, 9), rewards (B, N), dones (B,), info). Worlds
+        that are done are reset before returning; their terminal
+        observations are kept in info["final_obs"].
+        """
+        actions = np.asarray(actions, dtype=np.float64)
+        self.current_step += 1
+
+        prev_covered = self.covered_cells.copy()
+        moving = self.active.copy()
+
+        # ---- Movement ----
+        dx = actions[..., 0]
+        dy = actions[..., 1]
+        norm = np.hypot(dx, dy) + 1e-8
+        dx = dx / norm
+        dy = dy / norm
+
+        self.heading = np.where(moving, np.arctan2(dy, dx), self.heading)
+
+        nx = self.pos[..., 0] + dx * self.move_step
+        ny = self.pos[..., 1] + dy * self.move_step
+
+        # ---- Obstacle collision ----
+        if self.num_obstacles:
+            ox = self.obstacles[:, None, :, 0]
+            oy = self.obstacles[:, None, :, 1]
+            dist = np.hypot(nx[..., None] - ox, ny[..., None] - oy)
+            collided = (dist < self.obstacle_radius).any(axis=-1) & moving
+        else:
+            collided = np.zeros_like(moving)
+
+        free = moving & ~collided
+        self.pos[..., 0] = np.where(free, np.clip(nx, 0, self.width),
+                                    self.pos[..., 0])
+        self.pos[..., 1] = np.where(free, np.clip(ny, 0, self.height),
+                                    self.pos[..., 1])
+
+        # ---- Battery ----
+        self.battery = np.where(moving, self.battery - self.move_cost,
+                                self.battery)
+        self.active &= ~(moving & (self.battery <= 0))
+
+        # ---- Coverage ----
+        self._mark_covered(np.arange(self.num_envs), moving)
+
+        # ---------- Reward components ----------
+        rewards = np.where(moving, -0.01 - 0.2 * collided, -1.0)
+
+        new_coverage = self.covered_cells / self.grid_size
+        coverage_gain = new_coverage - prev_covered / self.grid_size
+        rewards += 100.0 * coverage_gain[:, None]   # shared team reward
+
+        dones = (
+            (self.current_step >= self.max_steps)
+            | ~self.active.any(axis=1)
+            | (new_coverage >= self.target_coverage)
+        )
+
+        obs = self._get_observations()
+        info = {"coverage": new_coverage}
+
+        # ---- Automatic per-world reset ----
+        done_worlds = np.flatnonzero(dones)
+        if len(done_worlds):
+            info["final_obs"] = obs[done_worlds].copy()
+            self._reset_worlds(done_worlds)
+            obs[done_worlds] = self._get_observations(done_worlds)
+
+        return obs, rewards, dones, info
+
+    # -------------------------------------------------
+    def _cells(self, x, y):
+        col = np.clip((x / self.cell_width).astype(np.int64),
+                      0, self.grid_cols - 1)
+        row = np.clip((y / self.cell_height).astype(np.int64),
+                      0, self.grid_rows - 1)
+        return row, col
+
+    def _mark_covered(self, worlds, mask):
+        pos = self.pos[worlds]
+        row, col = self._cells(pos[..., 0], pos[..., 1])
+
+        w = np.broadcast_to(np.asarray(worlds)[:, None], row.shape)[mask]
+        flat = (w * self.grid_size + row[mask] * self.grid_cols + col[mask])
+
+        grid_flat = self.grid.reshape(-1)
+        fresh = np.unique(flat[~grid_flat[flat]])
+        grid_flat[fresh] = True
+        np.add.at(self.covered_cells, fresh // self.grid_size, 1)
+
+        # A new cell at row r bumps every prefix of its column below r
+        b, cell = np.divmod(fresh, self.grid_size)
+        r, c = np.divmod(cell, self.grid_cols)
+        k, rows = np.nonzero(
+            np.arange(self.grid_rows + 1)[None, :] > r[:, None]
+        )
+        np.add.at(self.col_prefix, (b[k], c[k], rows), 1)
+
+    def _get_observations(self, worlds=None):
+        if worlds is None:
+            worlds = np.arange(self.num_envs)
+
+        pos = self.pos[worlds]
+        active = self.active[worlds]
+        radius = self.sensing_radius
+        B, N = active.shape
+
+        x = pos[..., 0]
+        y = pos[..., 1]
+
+        # ---------- Nearest drone ----------
+        rel = pos[:, None, :, :] - pos[:, :, None, :]          # (B, N, N, 2)
+        dist = np.hypot(rel[..., 0], rel[..., 1])
+        valid = active[:, None, :] & ~np.eye(N, dtype=np.bool_)
+        dist = np.where(valid & (dist < radius), dist, np.inf)
+        j = dist.argmin(axis=-1)
+        found = np.isfinite(np.take_along_axis(dist, j[..., None], -1))[..., 0]
+        near = np.take_along_axis(rel, j[..., None, None], axis=2)[:, :, 0]
+        nd = np.where(found[..., None], near / radius, 0.0)
+
+        # ---------- Nearest obstacle ----------
+        if self.num_obstacles:
+            obstacles = self.obstacles[worlds]
+            rel = obstacles[:, None, :, :] - pos[:, :, None, :]  # (B, N, M, 2)
+            dist = np.hypot(rel[..., 0], rel[..., 1])
+            dist = np.where(dist < radius, dist, np.inf)
+            k = dist.argmin(axis=-1)
+            found = np.isfinite(
+                np.take_along_axis(dist, k[..., None], -1)
+            )[..., 0]
+            near = np.take_along_axis(rel, k[..., None, None], axis=2)[:, :, 0]
+            od = np.where(found[..., None], near / radius, 0.0)
+        else:
+            od = np.zeros((B, N, 2))
+
+        # ---------- Local coverage ----------
+        local_cov = self._local_coverage(worlds, x, y, radius)
+
+        obs = np.stack([
+            x / self.width,
+            y / self.height,
+            self.heading[worlds] / np.pi,
+            self.battery[worlds] / self.max_battery,
+
+            nd[..., 0],
+            nd[..., 1],
+
+            od[..., 0],
+            od[..., 1],
+
+            local_cov
+        ], axis=-1).astype(np.float32)
+
+        # Inactive drone → zero observation
+        obs[~active] = 0.0
+        return obs
+
+    def _local_coverage(self, worlds, x, y, radius):
+        rad = int(radius / self.cell_size)
+        row, col = self._cells(x, y)
+
+        r0 = np.maximum(row - rad, 0)
+        r1 = np.minimum(row + rad, self.grid_rows - 1) + 1
+        c0 = np.maximum(col - rad, 0)
+        c1 = np.minimum(col + rad, self.grid_cols - 1) + 1
+
+        # Column counts inside the window, summed over its 2·rad+1 columns
+        cols = col[..., None] + np.arange(-rad, rad + 1)      # (B, N, W)
+        inside = (cols >= 0) & (cols < self.grid_cols)
+        cols = np.clip(cols, 0, self.grid_cols - 1)
+
+        w = np.asarray(worlds)[:, None, None]
+        counts = (self.col_prefix[w, cols, r1[..., None]]
+                  - self.col_prefix[w, cols, r0[..., None]])
+        covered = np.where(inside, counts, 0).sum(axis=-1)
+        total = (r1 - r0) * (c1 - c0)
+
+        return covered / total
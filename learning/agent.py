@@ -17,3 +17,21 @@ class PPOAgent:
         log_prob = dist.log_prob(action).sum().item()
 
         return action.numpy(), log_prob, value.item()
+
+    def act_batch(self, obs):
+        """
+        One forward pass for a whole batch of observations, shaped
+        (N, obs_dim) or (B, N, obs_dim). Returns actions (..., act_dim plus
+        any message outputs), log-probs (...) and values (...) as NumPy
+        arrays.
+        """
+        obs_t = torch.as_tensor(obs, dtype=torch.float32)
+
+        with torch.no_grad():
+            mean, std, value = self.policy(obs_t)
+
+            dist = Normal(mean, std)
+            action = dist.sample()
+            log_prob = dist.log_prob(action).sum(dim=-1)
+
+        return action.numpy(), log_prob.numpy(), value.squeeze(-1).numpy()
@@ -0,0 +1,313 @@
+"""
+Asynchronous actor-learner training.
+
+    python -m learning.async_train --actors 4 --updates 200
+
+Actor processes keep stepping their own Environment with a (possibly
+stale) copy of PolicyNet and push fixed-size trajectory segments into a
+bounded queue. The learner (this process) consumes them, runs PPO with an
+importance-weight correction for the staleness, and publishes new weights
+through shared memory every `publish_every` updates.
+"""
+import argparse
+import os
+import queue
+import random
+import time
+import multiprocessing as mp
+from multiprocessing import shared_memory
+
+import numpy as np
+import torch
+from torch.nn.utils import parameters_to_vector, vector_to_parameters
+
+from environment.env import Environment
+from environment.scenario_loader import Scenario
+from learning.agent import PPOAgent
+from learning.buffer import RolloutBuffer
+from learning.policy import PolicyNet
+from learning.ppo import ppo_update
+
+
+class SharedWeights:
+    """
+    Flat PolicyNet parameters in shared memory plus a version counter
+    (number of learner updates the weights include).
+    """
+
+    def __init__(self, policy, ctx):
+        self.size = sum(p.numel() for p in policy.parameters())
+        self.shm = shared_memory.SharedMemory(create=True, size=self.size * 4)
+        self.version = ctx.Value("q", -1, lock=False)
+        self.lock = ctx.Lock()
+        self._array()
+
+    def _array(self):
+        self.array = np.ndarray(self.size, dtype=np.float32, buffer=self.shm.buf)
+
+    def __getstate__(self):
+        # Child processes re-attach to the block by name
+        state = self.__dict__.copy()
+        del state["array"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._array()
+
+    def publish(self, policy, version):
+        vec = parameters_to_vector(policy.parameters()).detach().numpy()
+        with self.lock:
+            self.array[:] = vec
+            self.version.value = version
+
+    def pull(self, policy, have_version):
+        """Load newer weights into `policy`; returns the version it now has."""
+        if self.version.value == have_version:
+            return have_version
+
+        with self.lock:
+            vec = torch.from_numpy(self.array.copy())
+            version = self.version.value
+        vector_to_parameters(vec, policy.parameters())
+        return version
+
+    def close(self, unlink=False):
+        self.array = None
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+
+def _actor(actor_id, scenario, weights, segments, stop, segment_len, seed):
+    torch.set_num_threads(1)
+    random.seed(seed)
+    np.random.seed(seed % 2**32)
+    torch.manual_seed(seed)
+
+    env = Environment(scenario)
+    policy = PolicyNet.from_spec(env.spec)
+    agent = PPOAgent(policy)
+    version = weights.pull(policy, None)
+
+    T, N = segment_len, env.num_drones
+    obs = env.reset_arrays()
+
+    try:
+        while not stop.is_set():
+            # Weights only change between segments
+            version = weights.pull(policy, version)
+
+            seg = {
+                "obs": np.zeros((T, N, env.obs_dim), np.float32),
+                "actions": np.zeros((T, N, env.act_dim), np.float32),
+                "log_probs": np.zeros((T, N), np.float32),
+                "values": np.zeros((T, N), np.float32),
+                "rewards": np.zeros((T, N), np.float32),
+                "dones": np.zeros((T, N), np.float32),
+            }
+            coverages = []
+
+            for t in range(T):
+                actions, log_probs, values = agent.act_batch(obs)
+                seg["obs"][t] = obs
+                seg["actions"][t] = actions
+                seg["log_probs"][t] = log_probs
+                seg["values"][t] = values
+
+                # Rewards land in the segment; obs is the env's own buffer,
+                # already copied above
+                obs, _, _, done, _ = env.step_arrays(
+                    actions, rewards=seg["rewards"][t]
+                )
+                seg["dones"][t] = done
+
+                if done:
+                    coverages.append(env.coverage_grid.get_coverage_percentage())
+                    obs = env.reset_arrays()
+
+            seg.update(
+                actor=actor_id, version=version, next_obs=obs.copy(),
+                episode_coverage=coverages
+            )
+
+            while not stop.is_set():
+                try:
+                    segments.put(seg, timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+    except KeyboardInterrupt:
+        pass
+    finally:
+        weights.close()
+
+
+def _next_segment(segments, actors, timeout=1.0):
+    while True:
+        try:
+            return segments.get(timeout=timeout)
+        except queue.Empty:
+            dead = [i for i, p in enumerate(actors) if not p.is_alive()]
+            if dead:
+                raise RuntimeError(
+                    f"actor {dead[0]} exited (code {actors[dead[0]].exitcode})"
+                )
+
+
+def train_async(
+    scenario,
+    num_actors=4,
+    updates=100,
+    segment_len=128,
+    segments_per_update=4,
+    publish_every=1,
+    queue_size=8,
+    is_clip=1.0,
+    seed=0,
+    checkpoint_path=None,
+    **ppo_kwargs,
+):
+    """
+    Run the actor-learner loop for `updates` PPO updates. Each update
+    consumes `segments_per_update` segments of `segment_len` steps, laid
+    side by side in one (segment_len, N * segments_per_update) buffer so
+    every drone of every segment is its own GAE sequence.
+
+    Returns the per-update stats; each includes the policy lag (in
+    updates) of the segments it consumed.
+    """
+    ctx = mp.get_context("spawn")
+    torch.manual_seed(seed)
+
+    spec = scenario.compile()
+    policy = PolicyNet.from_spec(spec)
+    if checkpoint_path and os.path.exists(checkpoint_path):
+        policy.load_state_dict(torch.load(checkpoint_path))
+    optimizer = torch.optim.Adam(policy.parameters(), lr=3e-4)
+
+    weights = SharedWeights(policy, ctx)
+    version = 0
+    weights.publish(policy, version)
+
+    segments = ctx.Queue(maxsize=queue_size)
+    stop = ctx.Event()
+    actors = [
+        ctx.Process(
+            target=_actor,
+            args=(a, scenario, weights, segments, stop, segment_len, seed + a),
+            daemon=True,
+        )
+        for a in range(num_actors)
+    ]
+    for p in actors:
+        p.start()
+
+    N = spec.num_drones
+    buffer = RolloutBuffer(
+        segment_len, N * segments_per_update, spec.obs_dim, spec.act_dim
+    )
+    history = []
+
+    try:
+        for _ in range(updates):
+            wait_start = time.perf_counter()
+            lags, last_obs, coverages = [], [], []
+
+            for k in range(segments_per_update):
+                seg = _next_segment(segments, actors)
+                buffer.add_segment(
+                    k * N, seg["obs"], seg["actions"], seg["log_probs"],
+                    seg["values"], seg["rewards"], seg["dones"]
+                )
+                lags.append(version - seg["version"])
+                last_obs.append(seg["next_obs"])
+                coverages.extend(seg["episode_coverage"])
+            wait_time = time.perf_counter() - wait_start
+
+            # Segments are cut mid-episode: bootstrap from the next state
+            with torch.no_grad():
+                _, _, last_values = policy(
+                    torch.from_numpy(np.concatenate(last_obs))
+                )
+
+            stats = ppo_update(
+                policy, optimizer, buffer,
+                last_values=last_values.squeeze(-1).numpy(),
+                is_clip=is_clip,
+                **ppo_kwargs
+            )
+            buffer.clear()
+
+            version += 1
+            if version % publish_every == 0:
+                weights.publish(policy, version)
+                if checkpoint_path:
+                    torch.save(policy.state_dict(), checkpoint_path)
+
+            stats.update(
+                version=version,
+                wait_time=wait_time,
+                policy_lag_mean=float(np.mean(lags)),
+                policy_lag_max=int(np.max(lags)),
+                episode_coverage=(
+                    float(np.mean(coverages)) if coverages else None
+                ),
+            )
+            history.append(stats)
+
+            print(
+                f"Update {version} | lag {stats['policy_lag_mean']:.2f} "
+                f"(max {stats['policy_lag_max']}) | "
+                f"IS weight {stats['is_weight_mean']:.3f} | "
+                f"wait {wait_time:.3f}s | update {stats['update_time']:.3f}s"
+            )
+    finally:
+        stop.set()
+        # Drain so actors blocked on a full queue can exit
+        while any(p.is_alive() for p in actors):
+            try:
+                segments.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        for p in actors:
+            p.join(timeout=1.0)
+        segments.close()
+        weights.close(unlink=True)
+
+    if checkpoint_path:
+        torch.save(policy.state_dict(), checkpoint_path)
+
+    return history
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Async actor-learner PPO")
+    parser.add_argument("--scenario", default="configs/scenario.yaml")
+    parser.add_argument("--actors", type=int, default=4)
+    parser.add_argument("--updates", type=int, default=100)
+    parser.add_argument("--segment-len", type=int, default=128)
+    parser.add_argument("--segments-per-update", type=int, default=4)
+    parser.add_argument("--publish-every", type=int, default=1, metavar="K",
+                        help="broadcast weights to actors every K updates")
+    parser.add_argument("--queue-size", type=int, default=8)
+    parser.add_argument("--minibatch-size", type=int, default=512)
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--checkpoint", default="checkpoints/policy_latest.pth")
+    args = parser.parse_args()
+
+    train_async(
+        Scenario(args.scenario),
+        num_actors=args.actors,
+        updates=args.updates,
+        segment_len=args.segment_len,
+        segments_per_update=args.segments_per_update,
+        publish_every=args.publish_every,
+        queue_size=args.queue_size,
+        seed=args.seed,
+        checkpoint_path=args.checkpoint,
+        minibatch_size=args.minibatch_size,
+        max_grad_norm=0.5,
+        num_threads=args.threads,
+    )
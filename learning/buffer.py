@@ -1,16 +1,118 @@
+import numpy as np
+
+
 class RolloutBuffer:
-    def __init__(self):
-        self.obs = []
-        self.actions = []
-        self.log_probs = []
-        self.rewards = []
-        self.values = []
-        self.dones = []
+    """
+    Fixed-capacity rollout storage backed by preallocated arrays shaped
+    (T, N, ...): one row per environment step, one column per drone.
+
+    add() writes a whole step at the cursor; the filled part is exposed as
+    array views, so conversion to tensors needs no copy.
+    """
+
+    def __init__(self, capacity, num_agents, obs_dim=9, act_dim=2):
+        self.capacity = capacity
+        self.num_agents = num_agents
+
+        shape = (capacity, num_agents)
+        self._obs = np.zeros(shape + (obs_dim,), dtype=np.float32)
+        self._actions = np.zeros(shape + (act_dim,), dtype=np.float32)
+        self._log_probs = np.zeros(shape, dtype=np.float32)
+        self._rewards = np.zeros(shape, dtype=np.float32)
+        self._values = np.zeros(shape, dtype=np.float32)
+        self._dones = np.zeros(shape, dtype=np.float32)
+
+        self.ptr = 0
+
+    def add(self, obs, actions, log_probs, values, rewards, dones):
+        if self.ptr >= self.capacity:
+            raise RuntimeError("RolloutBuffer is full; call clear() first")
+
+        t = self.ptr
+        self._obs[t] = obs
+        self._actions[t] = actions
+        self._log_probs[t] = log_probs
+        self._values[t] = values
+        self._rewards[t] = rewards
+        self._dones[t] = dones
+        self.ptr += 1
+
+    def add_segment(self, column, obs, actions, log_probs, values, rewards,
+                    dones):
+        """
+        Write a whole trajectory segment shaped (T, n, ...) into columns
+        column:column + n, starting at step 0. Segments that share a buffer
+        must all have the same length T.
+        """
+        T, n = np.shape(log_probs)
+        cols = slice(column, column + n)
+
+        self._obs[:T, cols] = obs
+        self._actions[:T, cols] = actions
+        self._log_probs[:T, cols] = log_probs
+        self._values[:T, cols] = values
+        self._rewards[:T, cols] = rewards
+        self._dones[:T, cols] = dones
+        self.ptr = max(self.ptr, T)
+
+    @property
+    def full(self):
+        return self.ptr >= self.capacity
+
+    def __len__(self):
+        return self.ptr
+
+    # ---- Views of the filled part ----
+    @property
+    def obs(self):
+        return self._obs[:self.ptr]
+
+    @property
+    def actions(self):
+        return self._actions[:self.ptr]
+
+    @property
+    def log_probs(self):
+        return self._log_probs[:self.ptr]
+
+    @property
+    def rewards(self):
+        return self._rewards[:self.ptr]
+
+    @property
+    def values(self):
+        return self._values[:self.ptr]
+
+    @property
+    def dones(self):
+        return self._dones[:self.ptr]
 
     def clear(self):
-        self.obs.clear()
-        self.actions.clear()
-        self.log_probs.clear()
-        self.rewards.clear()
-        self.values.clear()
-        self.dones.clear()
+        self.ptr = 0
+
+    # ---- Checkpointing ----
+    def state_dict(self):
+        """Copies of the filled part, enough to continue a rollout."""
+        return {
+            "ptr": self.ptr,
+            "obs": self.obs.copy(),
+            "actions": self.actions.copy(),
+            "log_probs": self.log_probs.copy(),
+            "rewards": self.rewards.copy(),
+            "values": self.values.copy(),
+            "dones": self.dones.copy(),
+        }
+
+    def load_state_dict(self, state):
+        t = state["ptr"]
+        if t > self.capacity:
+            raise ValueError(
+                f"saved rollout has {t} steps, capacity is {self.capacity}"
+            )
+        self._obs[:t] = state["obs"]
+        self._actions[:t] = state["actions"]
+        self._log_probs[:t] = state["log_probs"]
+        self._rewards[:t] = state["rewards"]
+        self._values[:t] = state["values"]
+        self._dones[:t] = state["dones"]
+        self.ptr = t
@@ -0,0 +1,182 @@
+import copy
+import glob
+import os
+import queue
+import random
+import threading
+import time
+
+import numpy as np
+import torch
+
+from learning.numpy_policy import export_state
+
+
+def capture_rng():
+    return {
+        "python": random.getstate(),
+        "numpy": np.random.get_state(),
+        "torch": torch.get_rng_state(),
+    }
+
+
+def restore_rng(state):
+    random.setstate(state["python"])
+    np.random.set_state(state["numpy"])
+    torch.set_rng_state(state["torch"])
+
+
+def _atomic_save(obj, path):
+    tmp = f"{path}.tmp.{os.getpid()}"
+    torch.save(obj, tmp)
+    os.replace(tmp, path)
+
+
+class CheckpointManager:
+    """
+    Full training checkpoints written from a background thread.
+
+    save() only copies the state in memory (policy and optimizer state
+    dicts, RNG states of `random`, NumPy and torch, and whatever counters
+    the caller passes); a writer thread then stores it as
+    ckpt_<step>.pt through a temporary file and a rename, so a crash never
+    leaves a half-written checkpoint behind. The newest `keep_last` are
+    kept, plus best.pt for the highest `metric` seen. Every write also
+    refreshes `weights_path` with the bare policy weights for tools that
+    only load those, and `export_path` with a NumpyPolicy export.
+
+    With `fresh`, the checkpoints of an earlier run (ckpt_*.pt, best.pt) are
+    first moved to <directory>/previous/<time>/, so retention, resume() and
+    the best metric only ever see the current run's files.
+    """
+
+    def __init__(self, directory, keep_last=3, weights_path=None,
+                 export_path=None, fresh=False):
+        self.directory = directory
+        self.keep_last = keep_last
+        self.weights_path = weights_path
+        self.export_path = export_path
+        os.makedirs(directory, exist_ok=True)
+        if fresh:
+            self._archive()
+
+        self.best_metric = None
+        best = os.path.join(directory, "best.pt")
+        if os.path.exists(best):
+            self.best_metric = torch.load(best, weights_only=False)["metric"]
+
+        self._queue = queue.Queue()
+        self._error = None
+        self._thread = threading.Thread(target=self._writer, daemon=True)
+        self._thread.start()
+
+    # -------------------------------------------------
+    def save(self, step, policy, optimizer=None, metric=None, **counters):
+        """
+        Snapshot the training state as of `step` (an episode or update
+        number, used in the file name) and queue it for writing.
+        """
+        self._raise_pending()
+
+        state = {
+            "step": step,
+            "metric": metric,
+            "policy": {
+                k: v.detach().clone() for k, v in policy.state_dict().items()
+            },
+            "optimizer": (
+                copy.deepcopy(optimizer.state_dict()) if optimizer else None
+            ),
+            "rng": capture_rng(),
+            "counters": copy.deepcopy(counters),
+        }
+
+        best = metric is not None and (
+            self.best_metric is None or metric > self.best_metric
+        )
+        if best:
+            self.best_metric = metric
+
+        self._queue.put((state, best))
+
+    def _writer(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                state, best = item
+                self._write(state, best)
+            except Exception as e:
+                self._error = e
+            finally:
+                self._queue.task_done()
+
+    def _write(self, state, best):
+        path = os.path.join(self.directory, f"ckpt_{state['step']:08d}.pt")
+        _atomic_save(state, path)
+        if best:
+            _atomic_save(state, os.path.join(self.directory, "best.pt"))
+        if self.weights_path:
+            _atomic_save(state["policy"], self.weights_path)
+        if self.export_path:
+            export_state(state["policy"], self.export_path)
+
+        for old in self.checkpoints()[:-self.keep_last]:
+            os.remove(old)
+
+    def _raise_pending(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise RuntimeError("checkpoint write failed") from error
+
+    def wait(self):
+        """Block until every queued checkpoint is on disk."""
+        self._queue.join()
+        self._raise_pending()
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+        self._raise_pending()
+
+    def _archive(self):
+        old = self.checkpoints()
+        best = os.path.join(self.directory, "best.pt")
+        if os.path.exists(best):
+            old.append(best)
+        if not old:
+            return
+
+        archive = os.path.join(
+            self.directory, "previous", time.strftime("%Y%m%d-%H%M%S")
+        )
+        os.makedirs(archive, exist_ok=True)
+        for path in old:
+            os.replace(path, os.path.join(archive, os.path.basename(path)))
+
+    # -------------------------------------------------
+    def checkpoints(self):
+        """Paths of the kept ckpt_*.pt files, oldest first."""
+        return sorted(glob.glob(os.path.join(self.directory, "ckpt_*.pt")))
+
+    def latest(self):
+        paths = self.checkpoints()
+        return paths[-1] if paths else None
+
+    def resume(self, policy, optimizer=None, path=None):
+        """
+        Restore policy, optimizer and RNG states from `path` (default: the
+        newest checkpoint). Returns (step, counters), or None when there
+        is nothing to resume from.
+        """
+        path = path or self.latest()
+        if path is None:
+            return None
+
+        state = torch.load(path, weights_only=False)
+        policy.load_state_dict(state["policy"])
+        if optimizer is not None and state["optimizer"] is not None:
+            optimizer.load_state_dict(state["optimizer"])
+        restore_rng(state["rng"])
+        return state["step"], state["counters"]
@@ -0,0 +1,350 @@
+"""
+Multi-seed policy evaluation.
+
+    python -m learning.evaluate checkpoints/policy_latest.npz random frontier \\
+        --seeds 100 --scenarios configs/scenario.yaml --out eval
+
+Runs one headless episode per (scenario, policy, seed) in a process pool
+and writes, to --out:
+
+    episodes.csv   one row per episode
+    summary.json   mean, std and 95% confidence interval per metric
+    curves.npz     per-step coverage, (seeds, max_steps + 1) per pair
+
+Policies are "random", "frontier" (scripted: head for the nearest
+uncovered cell) or a policy file: a NumpyPolicy .npz, or a .pth / .pt
+(weights or full checkpoint) that is exported to .npz once up front, so
+the workers never import torch. `python plot_metrics.py --eval DIR` draws
+mean ± confidence bands from curves.npz.
+"""
+import argparse
+import csv
+import json
+import math
+import multiprocessing as mp
+import os
+import random
+import time
+
+import numpy as np
+
+from environment.env import Environment
+from environment.scenario_loader import Scenario
+
+
+METRICS = (
+    ("final_coverage", "Final coverage"),
+    ("time_to_target", "Steps to target"),
+    ("reached", "Target reached"),
+    ("energy", "Energy used"),
+    ("collisions", "Collisions"),
+)
+
+
+# ---- Policies ----
+class RandomPolicy:
+    """Uniform random actions, as in run_simulation --mode random."""
+
+    def act(self, env, obs):
+        return np.array(list(env.random_actions().values()))
+
+    def seed(self, seed):
+        pass   # env.random_actions() draws from the seeded `random`
+
+
+class FrontierPolicy:
+    """Scripted baseline: every drone heads for the nearest uncovered cell."""
+
+    def act(self, env, obs):
+        spec = env.spec
+        covered = np.zeros(spec.grid_cells, dtype=np.bool_)
+        covered[env.coverage_grid.covered_indices()] = True
+        free = np.flatnonzero(~covered)
+        if len(free) == 0:
+            return np.zeros((env.num_drones, env.act_dim))
+
+        rows, cols = np.divmod(free, spec.grid_cols)
+        cx = (cols + 0.5) * spec.cell_width
+        cy = (rows + 0.5) * spec.cell_height
+
+        x = env.pos[:, 0, None].astype(np.float64)
+        y = env.pos[:, 1, None].astype(np.float64)
+        j = ((cx - x) ** 2 + (cy - y) ** 2).argmin(axis=1)
+
+        actions = np.zeros((env.num_drones, env.act_dim))   # silent
+        actions[:, 0] = cx[j] - x[:, 0]
+        actions[:, 1] = cy[j] - y[:, 0]
+        return actions
+
+    def seed(self, seed):
+        pass
+
+
+class LearnedPolicy:
+    """NumpyPolicy actions; `deterministic` uses the mean action."""
+
+    def __init__(self, path, deterministic=False):
+        from learning.numpy_policy import NumpyPolicy
+        self.model = NumpyPolicy(path)
+        self.deterministic = deterministic
+
+    def act(self, env, obs):
+        actions, _, _ = self.model.act_batch(obs, self.deterministic)
+        return actions
+
+    def seed(self, seed):
+        self.model.seed(seed)
+
+
+def policy_label(name):
+    if name in ("random", "frontier"):
+        return name
+    return os.path.splitext(os.path.basename(name))[0]
+
+
+def prepare_policy(name, out):
+    """
+    Resolve a policy argument to something workers can load without
+    torch: .pth / .pt files are exported to `out`/<label>.npz.
+    """
+    if name in ("random", "frontier") or name.endswith(".npz"):
+        return name
+    if not name.endswith((".pth", ".pt")):
+        raise ValueError(
+            f"policy must be 'random', 'frontier' or a .npz/.pth/.pt file, "
+            f"got {name!r}"
+        )
+
+    import torch
+    from learning.numpy_policy import export_state
+
+    state = torch.load(name, weights_only=False)
+    if "policy" in state:   # full CheckpointManager checkpoint
+        state = state["policy"]
+    path = os.path.join(out, policy_label(name) + ".npz")
+    export_state(state, path)
+    return path
+
+
+def make_policy(name, deterministic=False):
+    if name == "random":
+        return RandomPolicy()
+    if name == "frontier":
+        return FrontierPolicy()
+    return LearnedPolicy(name, deterministic)
+
+
+# ---- Workers ----
+_cache = {}
+
+
+def _get(kind, key, build):
+    """Environments and policies are built once per worker process."""
+    if (kind, key) not in _cache:
+        _cache[(kind, key)] = build()
+    return _cache[(kind, key)]
+
+
+def run_episode(scenario_path, policy_name, seed, deterministic=False):
+    """
+    One headless episode. Returns (row, coverage curve); the curve has
+    max_steps + 1 entries and holds its last value after the episode ends.
+    """
+    env = _get("env", scenario_path,
+               lambda: Environment(Scenario(scenario_path)))
+    policy = _get("policy", (policy_name, deterministic),
+                  lambda: make_policy(policy_name, deterministic))
+
+    random.seed(seed)
+    np.random.seed(seed % 2**32)
+    policy.seed(seed)
+
+    spec = env.spec
+    curve = np.empty(spec.max_steps + 1, dtype=np.float32)
+    start = time.perf_counter()
+
+    obs = env.reset_arrays()
+    curve[0] = coverage = env.coverage_grid.get_coverage_percentage()
+    time_to_target = 0 if coverage >= spec.target_coverage else None
+    done = False
+    steps = 0
+
+    while not done:
+        actions = policy.act(env, obs)
+        obs, _, _, done, _ = env.step_arrays(actions)
+        steps += 1
+
+        curve[steps] = coverage = env.coverage_grid.get_coverage_percentage()
+        if time_to_target is None and coverage >= spec.target_coverage:
+            time_to_target = steps
+    curve[steps + 1:] = coverage
+
+    row = {
+        "scenario": scenario_path,
+        "policy": policy_label(policy_name),
+        "seed": seed,
+        "steps": steps,
+        "final_coverage": coverage,
+        "reached": int(time_to_target is not None),
+        # Episodes that never reach the target are left out of its mean
+        "time_to_target": (
+            time_to_target if time_to_target is not None else math.nan
+        ),
+        "energy": float(
+            (spec.max_battery - np.maximum(env.battery, 0.0)).sum()
+        ),
+        "collisions": env.collisions,
+        "wall_time": time.perf_counter() - start,
+    }
+    return row, curve
+
+
+def _run_task(task):
+    return run_episode(*task)
+
+
+# ---- Statistics ----
+def mean_ci(values, z=1.96):
+    """
+    Mean, std and a normal-approximation confidence interval of the mean
+    (95% for the default z), ignoring NaNs.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    values = values[~np.isnan(values)]
+    n = len(values)
+    if n == 0:
+        return {"n": 0, "mean": math.nan, "std": math.nan,
+                "ci_low": math.nan, "ci_high": math.nan}
+
+    mean = values.mean()
+    std = values.std(ddof=1) if n > 1 else 0.0
+    half = z * std / math.sqrt(n)
+    return {"n": n, "mean": mean, "std": std,
+            "ci_low": mean - half, "ci_high": mean + half}
+
+
+def summarize(rows):
+    """{scenario: {policy: {metric: mean_ci(...)}}} over the episode rows."""
+    groups = {}
+    for row in rows:
+        groups.setdefault(row["scenario"], {}).setdefault(
+            row["policy"], []
+        ).append(row)
+
+    return {
+        scenario: {
+            policy: {
+                metric: mean_ci([r[metric] for r in episodes])
+                for metric, _ in METRICS
+            }
+            for policy, episodes in policies.items()
+        }
+        for scenario, policies in groups.items()
+    }
+
+
+def format_summary(summary):
+    lines = []
+    for scenario, policies in summary.items():
+        lines.append(f"== {scenario}")
+        lines.append(
+            f"  {'policy':<16}" + "".join(f"{label:>29}" for _, label in METRICS)
+        )
+        for policy, stats in policies.items():
+            cells = "".join(
+                f"{s['mean']:>10.3f} "
+                f"[{s['ci_low']:>7.3f}, {s['ci_high']:>7.3f}]"
+                for s in (stats[metric] for metric, _ in METRICS)
+            )
+            lines.append(f"  {policy:<16}{cells}")
+    return "\n".join(lines)
+
+
+# ---- Driver ----
+def evaluate(policies, scenarios, seeds, workers=None, out="eval",
+             deterministic=False, first_seed=0):
+    """
+    Run len(scenarios) x len(policies) x `seeds` episodes on `workers`
+    processes (default: all CPUs) and write the results to `out`.
+    Returns the summary.
+    """
+    os.makedirs(out, exist_ok=True)
+    prepared = [prepare_policy(p, out) for p in policies]
+
+    tasks = [
+        (scenario, policy, first_seed + k, deterministic)
+        for scenario in scenarios
+        for policy in prepared
+        for k in range(seeds)
+    ]
+    workers = workers or os.cpu_count() or 1
+
+    start = time.perf_counter()
+    if workers == 1:
+        results = [_run_task(task) for task in tasks]
+    else:
+        ctx = mp.get_context("spawn")
+        with ctx.Pool(workers) as pool:
+            results = pool.map(
+                _run_task, tasks,
+                chunksize=max(1, len(tasks) // (workers * 4))
+            )
+    elapsed = time.perf_counter() - start
+
+    rows = [row for row, _ in results]
+    with open(os.path.join(out, "episodes.csv"), "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+    # One (seeds, max_steps + 1) array per scenario/policy pair, seed order
+    curves = {}
+    for row, curve in results:
+        key = f"{row['scenario']}|{row['policy']}"
+        curves.setdefault(key, []).append(curve)
+    np.savez_compressed(
+        os.path.join(out, "curves.npz"),
+        **{key: np.stack(c) for key, c in curves.items()}
+    )
+
+    summary = summarize(rows)
+    with open(os.path.join(out, "summary.json"), "w") as f:
+        json.dump({
+            "seeds": seeds,
+            "first_seed": first_seed,
+            "deterministic": deterministic,
+            "episodes": len(rows),
+            "workers": workers,
+            "wall_time": elapsed,
+            "results": summary,
+        }, f, indent=2)
+
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Evaluate policies over many seeds")
+    parser.add_argument("policies", nargs="+",
+                        help="random, frontier or a .npz/.pth/.pt policy file")
+    parser.add_argument("--scenarios", nargs="+",
+                        default=["configs/scenario.yaml"])
+    parser.add_argument("--seeds", type=int, default=100)
+    parser.add_argument("--first-seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None,
+                        help="processes (default: all CPUs)")
+    parser.add_argument("--deterministic", action="store_true",
+                        help="learned policies take their mean action")
+    parser.add_argument("--out", default="eval")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    summary = evaluate(
+        args.policies, args.scenarios, args.seeds, args.workers, args.out,
+        args.deterministic, args.first_seed
+    )
+    print(format_summary(summary))
+    print(
+        f"{args.seeds} seeds x {len(args.policies)} policies x "
+        f"{len(args.scenarios)} scenarios in {time.perf_counter() - start:.1f}s"
+        f" → {args.out}"
+    )
@@ -0,0 +1,227 @@
+import json
+import os
+
+import numpy as np
+
+
+STEP_FIELDS = [
+    ("step", "i8"),
+    ("episode", "i4"),
+    ("coverage", "f4"),
+    ("reward", "f4"),
+    ("active", "i4"),
+    ("battery", "f4"),
+    ("step_time", "f4"),
+]
+
+EPISODE_FIELDS = [
+    ("episode", "i4"),
+    ("steps", "i4"),
+    ("reward", "f4"),
+    ("coverage", "f4"),
+    ("wall_time", "f4"),
+]
+
+
+class MetricStream:
+    """
+    Append-only table of fixed-width records stored in memory-mapped chunk
+    files <name>_00000.bin, <name>_00001.bin, ... of `chunk_size` rows each.
+
+    The row count lives in its own small mapped file and is bumped after
+    every append, so whatever was written before a crash survives and a
+    reader in another process can follow the stream while it grows.
+
+    With `rows`, an existing stream is reopened and continues after its
+    first `rows` records (later ones are overwritten), e.g. when training
+    resumes from a checkpoint.
+    """
+
+    def __init__(self, directory, name, fields, chunk_size=1 << 16,
+                 rows=None):
+        self.directory = directory
+        self.name = name
+        self.dtype = np.dtype(fields)
+        self.chunk_size = chunk_size
+        self.chunk = None
+
+        if rows is None:
+            with open(self._path(".json"), "w") as f:
+                json.dump({"fields": fields, "chunk_size": chunk_size}, f)
+            self.count = np.memmap(
+                self._path(".count"), dtype=np.int64, mode="w+", shape=(1,)
+            )
+            self.rows = 0
+            return
+
+        with open(self._path(".json")) as f:
+            self.chunk_size = json.load(f)["chunk_size"]
+        self.count = np.memmap(
+            self._path(".count"), dtype=np.int64, mode="r+", shape=(1,)
+        )
+        self.rows = rows
+        self.count[0] = rows
+        if rows % self.chunk_size:
+            self.chunk = np.memmap(
+                self._chunk_path(rows // self.chunk_size),
+                dtype=self.dtype, mode="r+", shape=(self.chunk_size,)
+            )
+
+    def _path(self, suffix):
+        return os.path.join(self.directory, self.name + suffix)
+
+    def _chunk_path(self, k):
+        return self._path(f"_{k:05d}.bin")
+
+    def append(self, *values):
+        i = self.rows % self.chunk_size
+        if i == 0:
+            if self.chunk is not None:
+                self.chunk.flush()
+            self.chunk = np.memmap(
+                self._chunk_path(self.rows // self.chunk_size),
+                dtype=self.dtype, mode="w+", shape=(self.chunk_size,)
+            )
+
+        self.chunk[i] = values
+        self.rows += 1
+        self.count[0] = self.rows
+
+    def flush(self):
+        if self.chunk is not None:
+            self.chunk.flush()
+        self.count.flush()
+
+    def close(self):
+        self.flush()
+        self.chunk = None
+        self.count = None
+
+
+class MetricsWriter:
+    """
+    Streams per-step and per-episode scalars of a run into `directory`
+    (see MetricStream). Opening a directory starts a new log there, unless
+    `resume` gives the row counts (from rows()) to continue after. A log
+    that no longer holds that many rows (deleted, or replaced by another
+    run) cannot be continued and is started over; `resumed` tells which.
+    """
+
+    def __init__(self, directory, chunk_size=1 << 16, resume=None):
+        os.makedirs(directory, exist_ok=True)
+        if resume is not None and not MetricsReader(directory).holds(resume):
+            resume = None
+        self.resumed = resume is not None
+        if resume is None:
+            resume = {}
+            for name in os.listdir(directory):
+                if name.startswith(("step", "episode")):
+                    os.remove(os.path.join(directory, name))
+
+        self.directory = directory
+        self.steps = MetricStream(
+            directory, "step", STEP_FIELDS, chunk_size, resume.get("step")
+        )
+        self.episodes = MetricStream(
+            directory, "episode", EPISODE_FIELDS, chunk_size,
+            resume.get("episode")
+        )
+
+    def rows(self):
+        return {"step": self.steps.rows, "episode": self.episodes.rows}
+
+    def log_step(self, step, episode, coverage, reward, active, battery,
+                 step_time):
+        self.steps.append(step, episode, coverage, reward, active, battery,
+                          step_time)
+
+    def log_episode(self, episode, steps, reward, coverage, wall_time):
+        self.episodes.append(episode, steps, reward, coverage, wall_time)
+
+    def flush(self):
+        self.steps.flush()
+        self.episodes.flush()
+
+    def close(self):
+        self.steps.close()
+        self.episodes.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# -------------------------------------------------
+class MetricsReader:
+    """
+    Read side of MetricsWriter; safe to use while the run is still writing.
+    Chunks are memory-mapped read-only, so nothing is loaded until a column
+    is actually used.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def _meta(self, name):
+        with open(os.path.join(self.directory, name + ".json")) as f:
+            meta = json.load(f)
+        dtype = np.dtype([tuple(field) for field in meta["fields"]])
+        return dtype, meta["chunk_size"]
+
+    def holds(self, rows):
+        """Whether every stream `name` has at least rows[name] records."""
+        return all(
+            os.path.exists(os.path.join(self.directory, name + ".count"))
+            and self.length(name) >= n
+            for name, n in rows.items()
+        )
+
+    def length(self, name):
+        count = np.fromfile(
+            os.path.join(self.directory, name + ".count"), dtype=np.int64
+        )
+        return int(count[0]) if len(count) else 0
+
+    def chunks(self, name):
+        """Yield the written rows of stream `name` chunk by chunk."""
+        dtype, chunk_size = self._meta(name)
+        n = self.length(name)
+
+        for k, lo in enumerate(range(0, n, chunk_size)):
+            path = os.path.join(self.directory, f"{name}_{k:05d}.bin")
+            rows = np.memmap(path, dtype=dtype, mode="r",
+                             shape=(chunk_size,))
+            yield rows[:min(chunk_size, n - lo)]
+
+    def column(self, name, field):
+        """Whole column as one array (loads it)."""
+        parts = [rows[field] for rows in self.chunks(name)]
+        if not parts:
+            return np.zeros(0, dtype=self._meta(name)[0][field])
+        return np.concatenate(parts)
+
+    def downsample(self, name, field, max_points=2000):
+        """
+        Column reduced to at most `max_points` bucket means, computed one
+        chunk at a time. Returns (x, y): x is the mean row index of each
+        bucket.
+        """
+        n = self.length(name)
+        bucket = max(1, -(-n // max_points))
+        buckets = -(-n // bucket)
+
+        sums = np.zeros(buckets)
+        counts = np.zeros(buckets)
+        offset = 0
+        for rows in self.chunks(name):
+            ids = (offset + np.arange(len(rows))) // bucket
+            sums += np.bincount(ids, weights=rows[field], minlength=buckets)
+            counts += np.bincount(ids, minlength=buckets)
+            offset += len(rows)
+
+        starts = np.arange(buckets) * bucket
+        x = starts + (counts - 1) / 2
+        y = sums / np.maximum(counts, 1)
+        return x, y
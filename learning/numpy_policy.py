@@ -0,0 +1,119 @@
+"""
+PolicyNet inference in plain NumPy.
+
+    python -m learning.numpy_policy checkpoints/policy_latest.pth
+
+exports the weights of a saved PolicyNet to a .npz next to it (same name,
+.npz suffix). NumpyPolicy loads such a file and runs the forward pass and
+action sampling without PyTorch, for demo and evaluation processes.
+"""
+import argparse
+import math
+import os
+
+import numpy as np
+
+
+def export_state(state_dict, path):
+    """Write PolicyNet state-dict tensors to `path` (.npz), atomically."""
+    arrays = {k: v.detach().cpu().numpy() for k, v in state_dict.items()}
+    tmp = f"{path}.tmp.{os.getpid()}"
+    with open(tmp, "wb") as f:
+        np.savez(f, **arrays)
+    os.replace(tmp, path)
+
+
+def export_policy(policy, path):
+    export_state(policy.state_dict(), path)
+
+
+class NumpyPolicy:
+    """
+    Same outputs as PolicyNet (mean, std, value) for observations shaped
+    (obs_dim,) or (..., obs_dim), computed in float32 like the torch model,
+    including the message head when the export has one.
+    """
+
+    def __init__(self, path):
+        with np.load(path) as w:
+            # Stored as (out, in) like nn.Linear; kept transposed for x @ W
+            self.fc1_w = np.ascontiguousarray(w["fc1.weight"].T)
+            self.fc1_b = w["fc1.bias"]
+            self.fc2_w = np.ascontiguousarray(w["fc2.weight"].T)
+            self.fc2_b = w["fc2.bias"]
+            self.mean_w = np.ascontiguousarray(w["mean.weight"].T)
+            self.mean_b = w["mean.bias"]
+            self.value_w = np.ascontiguousarray(w["value.weight"].T)
+            self.value_b = w["value.bias"]
+            self.log_std = w["log_std"]
+
+            self.message_dim = 0
+            if "message.weight" in w:
+                self.message_w = np.ascontiguousarray(w["message.weight"].T)
+                self.message_b = w["message.bias"]
+                self.message_dim = len(self.message_b)
+                self.log_std = np.concatenate(
+                    [self.log_std, w["message_log_std"]]
+                )
+
+        self.std = np.exp(self.log_std)
+        self.rng = np.random.default_rng()
+
+    def forward(self, obs):
+        x = np.asarray(obs, dtype=np.float32)
+
+        x = np.maximum(x @ self.fc1_w + self.fc1_b, 0.0)
+        x = np.maximum(x @ self.fc2_w + self.fc2_b, 0.0)
+
+        mean = x @ self.mean_w + self.mean_b
+        if self.message_dim:
+            message = np.tanh(x @ self.message_w + self.message_b)
+            mean = np.concatenate([mean, message], axis=-1)
+        value = x @ self.value_w + self.value_b
+
+        return mean, self.std, value
+
+    __call__ = forward
+
+    def act_batch(self, obs, deterministic=False):
+        """
+        Like PPOAgent.act_batch: actions (..., 2 + message_dim), log-probs
+        (...) and values (...). `deterministic` returns the mean action.
+        """
+        mean, std, value = self.forward(obs)
+
+        if deterministic:
+            action = mean
+        else:
+            noise = self.rng.standard_normal(mean.shape, dtype=np.float32)
+            action = mean + std * noise
+
+        # Normal(mean, std).log_prob summed over action dimensions
+        z = (action - mean) / std
+        log_prob = (
+            -0.5 * z * z - self.log_std - 0.5 * math.log(2 * math.pi)
+        ).sum(axis=-1)
+
+        return action, log_prob, value[..., 0]
+
+    def seed(self, seed):
+        self.rng = np.random.default_rng(seed)
+
+
+if __name__ == "__main__":
+    import torch
+
+    parser = argparse.ArgumentParser(
+        description="Export PolicyNet weights for NumpyPolicy"
+    )
+    parser.add_argument("checkpoint")
+    parser.add_argument("--out", default=None,
+                        help="output .npz (default: checkpoint with .npz)")
+    args = parser.parse_args()
+
+    state = torch.load(args.checkpoint, weights_only=False)
+    if "policy" in state:   # full CheckpointManager checkpoint
+        state = state["policy"]
+    out = args.out or os.path.splitext(args.checkpoint)[0] + ".npz"
+    export_state(state, out)
+    print(f"wrote {out}")
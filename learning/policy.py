@@ -4,7 +4,13 @@ import torch.nn.functional as F
 
 
 class PolicyNet(nn.Module):
-    def __init__(self, obs_dim=9, act_dim=2):
+    """
+    Gaussian policy and value head. With `message_dim`, a message head adds
+    that many outputs (tanh-squashed means) after the `act_dim` movement
+    outputs; messages are sampled and trained as part of the action.
+    """
+
+    def __init__(self, obs_dim=9, act_dim=2, message_dim=0):
         super().__init__()
 
         self.fc1 = nn.Linear(obs_dim, 64)
@@ -15,12 +21,26 @@ class PolicyNet(nn.Module):
 
         self.value = nn.Linear(64, 1)
 
+        # ---- Message head ----
+        self.message_dim = message_dim
+        if message_dim:
+            self.message = nn.Linear(64, message_dim)
+            self.message_log_std = nn.Parameter(torch.zeros(message_dim))
+
+    @classmethod
+    def from_spec(cls, spec):
+        """PolicyNet sized for a CompiledScenario's observations/messages."""
+        return cls(spec.obs_dim, 2, spec.message_dim)
+
     def forward(self, x):
         x = F.relu(self.fc1(x))
         x = F.relu(self.fc2(x))
 
         mean = self.mean(x)
         std = torch.exp(self.log_std)
+        if self.message_dim:
+            mean = torch.cat([mean, torch.tanh(self.message(x))], dim=-1)
+            std = torch.cat([std, torch.exp(self.message_log_std)])
 
         value = self.value(x)
 
@@ -1,19 +1,40 @@
+import time
+import numpy as np
 import torch
+import torch.nn as nn
 import torch.nn.functional as F
 from torch.distributions import Normal
 
 
-def compute_gae(rewards, values, dones, gamma=0.99, lam=0.95):
-    advantages = []
-    gae = 0.0
-    values = values + [0.0]
+def compute_gae(rewards, values, dones, last_values=0.0, gamma=0.99, lam=0.95):
+    """
+    Generalized advantage estimates for arrays shaped (T,) or (T, N); with
+    (T, N) each of the N agents is its own sequence.
 
-    for t in reversed(range(len(rewards))):
-        delta = rewards[t] + gamma * values[t + 1] * (1 - dones[t]) - values[t]
-        gae = delta + gamma * lam * (1 - dones[t]) * gae
-        advantages.insert(0, gae)
+    The reverse recursion adv[t] = delta[t] + c[t] * adv[t + 1] is solved as
+    a prefix scan: log2(T) whole-array steps instead of T Python iterations.
+    """
+    rewards = np.asarray(rewards, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64)
+    not_done = 1.0 - np.asarray(dones, dtype=np.float64)
 
-    return advantages
+    last = np.broadcast_to(
+        np.asarray(last_values, dtype=np.float64), values.shape[1:]
+    )
+    next_values = np.concatenate([values[1:], last[None]])
+
+    adv = rewards + gamma * next_values * not_done - values
+    coef = gamma * lam * not_done
+
+    # After the pass with span s, adv[t] covers steps t .. t + 2s - 1 and
+    # coef[t] is the discount carried from step t + 2s.
+    span = 1
+    while span < len(adv):
+        adv[:-span] += coef[:-span] * adv[span:]
+        coef[:-span] *= coef[span:]
+        span *= 2
+
+    return adv
 
 
 def ppo_update(
@@ -24,41 +45,123 @@ def ppo_update(
     value_coef=0.5,
     entropy_coef=0.01,
     epochs=4,
+    minibatch_size=None,
+    max_grad_norm=None,
+    target_kl=None,
+    num_threads=None,
+    last_values=None,
+    is_clip=None,
 ):
-    obs = torch.tensor(buffer.obs, dtype=torch.float32)
-    actions = torch.tensor(buffer.actions, dtype=torch.float32)
-    old_log_probs = torch.tensor(buffer.log_probs, dtype=torch.float32)
-    rewards = buffer.rewards
-    dones = buffer.dones
-
-    with torch.no_grad():
-        _, _, values = policy(obs)
-        values = values.squeeze().tolist()
-
-    advantages = compute_gae(rewards, values, dones)
-    returns = [a + v for a, v in zip(advantages, values)]
-
-    advantages = torch.tensor(advantages, dtype=torch.float32)
-    returns = torch.tensor(returns, dtype=torch.float32)
+    """
+    PPO epochs over the buffer in shuffled minibatches of `minibatch_size`
+    samples (None = the whole buffer at once). Optionally clips the gradient
+    norm, stops early once the approximate KL to the rollout policy exceeds
+    `target_kl`, and runs with `num_threads` torch intra-op threads.
+
+    `last_values` (N,) bootstraps rollouts that were cut mid-episode. For
+    rollouts collected by a stale policy, set `is_clip`: the buffer's
+    log-probs are then treated as the behavior policy, the clipped ratio is
+    taken against the current policy instead, and each sample is weighted
+    by the importance weight current/behavior truncated at `is_clip`
+    (decoupled PPO). Values are also re-evaluated with the current policy.
+
+    Returns a dict of stats, including wall time and samples/sec.
+    """
+    start_time = time.perf_counter()
+
+    prev_threads = torch.get_num_threads()
+    if num_threads is not None:
+        torch.set_num_threads(num_threads)
+
+    # Zero-copy views of the (T, N, ...) buffer, flattened to samples
+    obs = torch.from_numpy(buffer.obs).flatten(0, 1)
+    actions = torch.from_numpy(buffer.actions).flatten(0, 1)
+    old_log_probs = torch.from_numpy(buffer.log_probs).flatten()
+    rollout_values = buffer.values
+    is_weights = None
+
+    # ---- Off-policy correction for stale rollouts ----
+    if is_clip is not None:
+        with torch.no_grad():
+            mean, std, values = policy(obs)
+            prox_log_probs = Normal(mean, std).log_prob(actions).sum(dim=1)
+
+        is_weights = torch.exp(prox_log_probs - old_log_probs).clamp(max=is_clip)
+        old_log_probs = prox_log_probs
+        rollout_values = values.reshape(buffer.values.shape).numpy()
+
+    if last_values is None:
+        last_values = 0.0
+    advantages = compute_gae(
+        buffer.rewards, rollout_values, buffer.dones, last_values
+    )
+    returns = advantages + rollout_values
+
+    advantages = torch.from_numpy(advantages.astype(np.float32)).flatten()
+    returns = torch.from_numpy(returns.astype(np.float32)).flatten()
 
     advantages = (advantages - advantages.mean()) / (advantages.std() + 1e-8)
 
-    for _ in range(epochs):
-        mean, std, values = policy(obs)
-        dist = Normal(mean, std)
-        log_probs = dist.log_prob(actions).sum(dim=1)
-        entropy = dist.entropy().sum(dim=1).mean()
-
-        ratio = torch.exp(log_probs - old_log_probs)
-
-        surr1 = ratio * advantages
-        surr2 = torch.clamp(ratio, 1 - clip_eps, 1 + clip_eps) * advantages
-        policy_loss = -torch.min(surr1, surr2).mean()
-
-        value_loss = F.mse_loss(values.squeeze(), returns)
-
-        loss = policy_loss + value_coef * value_loss - entropy_coef * entropy
-
-        optimizer.zero_grad()
-        loss.backward()
-        optimizer.step()
+    n = len(obs)
+    batch = n if minibatch_size is None else minibatch_size
+    epochs_run = 0
+    approx_kl = 0.0
+
+    try:
+        for _ in range(epochs):
+            perm = torch.randperm(n) if batch < n else torch.arange(n)
+            kl_sum, kl_count = 0.0, 0
+
+            for lo in range(0, n, batch):
+                idx = perm[lo:lo + batch]
+
+                mean, std, values = policy(obs[idx])
+                dist = Normal(mean, std)
+                log_probs = dist.log_prob(actions[idx]).sum(dim=1)
+                entropy = dist.entropy().sum(dim=1).mean()
+
+                log_ratio = log_probs - old_log_probs[idx]
+                ratio = torch.exp(log_ratio)
+
+                surr1 = ratio * advantages[idx]
+                surr2 = torch.clamp(ratio, 1 - clip_eps, 1 + clip_eps) * advantages[idx]
+                surrogate = torch.min(surr1, surr2)
+                if is_weights is not None:
+                    surrogate = is_weights[idx] * surrogate
+                policy_loss = -surrogate.mean()
+
+                value_loss = F.mse_loss(values.squeeze(-1), returns[idx])
+
+                loss = policy_loss + value_coef * value_loss - entropy_coef * entropy
+
+                optimizer.zero_grad()
+                loss.backward()
+                if max_grad_norm is not None:
+                    nn.utils.clip_grad_norm_(policy.parameters(), max_grad_norm)
+                optimizer.step()
+
+                with torch.no_grad():
+                    kl_sum += ((ratio - 1) - log_ratio).mean().item()
+                    kl_count += 1
+
+            epochs_run += 1
+            approx_kl = kl_sum / kl_count
+            if target_kl is not None and approx_kl > target_kl:
+                break
+    finally:
+        torch.set_num_threads(prev_threads)
+
+    elapsed = time.perf_counter() - start_time
+    return {
+        "update_time": elapsed,
+        "samples": n,
+        "samples_per_sec": n / elapsed,
+        "epochs": epochs_run,
+        "approx_kl": approx_kl,
+        "policy_loss": policy_loss.item() if epochs_run else 0.0,
+        "value_loss": value_loss.item() if epochs_run else 0.0,
+        "entropy": entropy.item() if epochs_run else 0.0,
+        "is_weight_mean": (
+            is_weights.mean().item() if is_weights is not None else 1.0
+        ),
+    }
@@ -1,17 +1,114 @@
+import os
+import argparse
 import numpy as np
 import matplotlib.pyplot as plt
 
-random_cov = np.load("coverage_random.npy")
-trained_cov = np.load("coverage_trained.npy")
+from learning.metrics import MetricsReader
 
-plt.figure(figsize=(8, 5))
-plt.plot(random_cov, label="Random Policy", linestyle="--", color="red")
-plt.plot(trained_cov, label="Trained Policy", color="green")
+METRICS_DIR = "metrics"
+MAX_POINTS = 2000   # per curve; long runs are averaged into buckets
 
-plt.xlabel("Time step")
-plt.ylabel("Coverage")
-plt.title("Random vs Trained Policy (Coverage Comparison)")
-plt.legend()
-plt.grid(True)
-plt.tight_layout()
+
+def load_coverage(mode):
+    """
+    Downsampled per-step coverage of the latest `mode` ("random" or
+    "trained") demo run; for "trained" without a demo, the training run.
+    Falls back to the coverage_<mode>.npy files written by older versions.
+    """
+    runs = ["demo_" + mode] + (["train"] if mode == "trained" else [])
+    for run in runs:
+        directory = os.path.join(METRICS_DIR, run)
+        if os.path.exists(os.path.join(directory, "step.count")):
+            return MetricsReader(directory).downsample(
+                "step", "coverage", MAX_POINTS
+            )
+
+    legacy = f"coverage_{mode}.npy"
+    if os.path.exists(legacy):
+        y = np.load(legacy, mmap_mode="r")
+        step = max(1, -(-len(y) // MAX_POINTS))
+        return np.arange(0, len(y), step), np.asarray(y[::step])
+    return None
+
+
+def plot_eval(directory):
+    """
+    Mean coverage curve ± 95% confidence band (normal approximation) of
+    every policy in a `python -m learning.evaluate` output, one figure per
+    scenario.
+    """
+    with np.load(os.path.join(directory, "curves.npz")) as data:
+        curves = {key: data[key] for key in data.files}
+
+    figures = {}
+    for key, runs in curves.items():
+        scenario, policy = key.split("|", 1)
+        if scenario not in figures:
+            figures[scenario] = plt.figure(figsize=(8, 5)).number
+            plt.xlabel("Time step")
+            plt.ylabel("Coverage")
+            plt.title(f"Coverage over {len(runs)} seeds ({scenario})")
+            plt.grid(True)
+        plt.figure(figures[scenario])
+
+        mean = runs.mean(axis=0)
+        half = 1.96 * runs.std(axis=0, ddof=1) / np.sqrt(len(runs)) \
+            if len(runs) > 1 else np.zeros_like(mean)
+        steps = np.arange(len(mean))
+        line, = plt.plot(steps, mean, label=policy)
+        plt.fill_between(steps, mean - half, mean + half,
+                         color=line.get_color(), alpha=0.25)
+
+    for number in figures.values():
+        plt.figure(number)
+        plt.legend()
+        plt.tight_layout()
+
+
+def plot_runs():
+    """Coverage of the latest random and trained runs, plus episode rewards."""
+    plt.figure(figsize=(8, 5))
+
+    styles = {
+        "random": dict(label="Random Policy", linestyle="--", color="red"),
+        "trained": dict(label="Trained Policy", color="green"),
+    }
+    for mode, style in styles.items():
+        curve = load_coverage(mode)
+        if curve is not None:
+            plt.plot(*curve, **style)
+
+    plt.xlabel("Time step")
+    plt.ylabel("Coverage")
+    plt.title("Random vs Trained Policy (Coverage Comparison)")
+    plt.legend()
+    plt.grid(True)
+    plt.tight_layout()
+
+    # ---- Episode rewards (training runs) ----
+    trained = os.path.join(METRICS_DIR, "train")
+    if os.path.exists(os.path.join(trained, "episode.count")):
+        reader = MetricsReader(trained)
+        if reader.length("episode") > 1:
+            plt.figure(figsize=(8, 5))
+            plt.plot(*reader.downsample("episode", "reward", MAX_POINTS),
+                     color="green")
+            plt.xlabel("Episode")
+            plt.ylabel("Total reward")
+            plt.title("Episode Reward (Trained Policy)")
+            plt.grid(True)
+            plt.tight_layout()
+
+
+parser = argparse.ArgumentParser(description="Plot run metrics")
+parser.add_argument("--eval", metavar="DIR",
+                    help="plot mean ± 95%% CI curves written by "
+                         "python -m learning.evaluate instead")
+args = parser.parse_args()
+
+if args.eval:
+    plot_eval(args.eval)
+else:
+    plot_runs()
 plt.show()
+
@@ -1,19 +1,16 @@
 import os
-import torch
+import time
+import random
+import argparse
+import numpy as np
 
 from environment.scenario_loader import Scenario
 from environment.env import Environment
-from environment.pygame_renderer import PygameRenderer
-
-from learning.policy import PolicyNet
-from learning.buffer import RolloutBuffer
-from learning.agent import PPOAgent
-from learning.ppo import ppo_update
-
 
-coverage_history = []
-reward_history = []
+from learning.metrics import MetricsWriter
 
+# torch, pygame and the rest of the learning stack are imported further
+# down, only on the paths that use them (tests/test_startup.py checks it)
 
 
 # ================= SETTINGS =================
@@ -21,27 +18,177 @@ TRAIN = False       # 🔴 True = train, False = demo
 MODE = "trained"   # "trained" or "random"
 EPISODES = 300         # only used when TRAIN=True
 STEPS_PER_UPDATE = 1024
+RENDER_EVERY = 1       # draw one frame every K steps (0 = never)
+SEED = None            # seed random / NumPy / torch for repeatable runs
+INFERENCE = "torch"    # demo policy: "torch" or "numpy" (no torch import)
+STEP_BACKEND = None    # "numpy" / "numba" (None = scenario's step_backend)
+
+# PPO update
+PPO_EPOCHS = 4
+MINIBATCH_SIZE = 512
+MAX_GRAD_NORM = 0.5
+TARGET_KL = None       # e.g. 0.02 to stop epochs early
+TORCH_THREADS = None   # intra-op threads for updates (None = torch default)
+
+# Profiling
+PROFILE = False        # per-phase Environment.step timings
+PROFILE_CAPTURE = 0    # cProfile + tracemalloc window of N steps (0 = off)
+PROFILE_START = 100    # global step at which the capture window opens
+PROFILE_DIR = "profiles"
+
+METRICS_DIR = "metrics"   # streamed to metrics/train/ or metrics/demo_<MODE>/
+RECORD_DIR = None         # save every episode for replay here (None = off)
 
 CHECKPOINT_DIR = "checkpoints"
-CHECKPOINT_PATH = f"{CHECKPOINT_DIR}/policy_latest.pth"
+CHECKPOINT_PATH = f"{CHECKPOINT_DIR}/policy_latest.pth"   # weights only
+EXPORT_PATH = f"{CHECKPOINT_DIR}/policy_latest.npz"       # for NumpyPolicy
+CHECKPOINT_EVERY = 1   # episodes between full training checkpoints
+KEEP_CHECKPOINTS = 3   # newest full checkpoints kept (plus best.pt)
 os.makedirs(CHECKPOINT_DIR, exist_ok=True)
 # ============================================
 
 
-# ----------- ENV SETUP -----------
-scenario = Scenario("configs/scenario.yaml")
-env = Environment(scenario)
-renderer = PygameRenderer(scenario)
-
-policy = PolicyNet(obs_dim=9, act_dim=2)
-optimizer = torch.optim.Adam(policy.parameters(), lr=3e-4)
+# ----------- COMMAND LINE (overrides SETTINGS) -----------
+parser = argparse.ArgumentParser(description="Drone swarm simulation")
+parser.add_argument("--train", action="store_true", default=TRAIN,
+                    help="train the policy instead of running a demo")
+parser.add_argument("--mode", choices=["trained", "random"], default=MODE)
+parser.add_argument("--episodes", type=int, default=EPISODES)
+parser.add_argument("--headless", action="store_true",
+                    help="no window and no pygame import")
+parser.add_argument("--render-every", type=int, default=RENDER_EVERY,
+                    metavar="K", help="draw one frame every K steps (0 = never)")
+parser.add_argument("--minibatch-size", type=int, default=MINIBATCH_SIZE)
+parser.add_argument("--ppo-epochs", type=int, default=PPO_EPOCHS)
+parser.add_argument("--target-kl", type=float, default=TARGET_KL)
+parser.add_argument("--threads", type=int, default=TORCH_THREADS,
+                    help="torch intra-op threads used by PPO updates")
+parser.add_argument("--seed", type=int, default=SEED)
+parser.add_argument("--inference", choices=["torch", "numpy"],
+                    default=INFERENCE,
+                    help="demo policy backend; numpy never imports torch")
+parser.add_argument("--step-backend", choices=["numpy", "numba"],
+                    default=STEP_BACKEND,
+                    help="environment step backend (default: the scenario's)")
+parser.add_argument("--fresh", action="store_true",
+                    help="train from scratch instead of resuming")
+parser.add_argument("--metrics-dir", default=METRICS_DIR, metavar="DIR",
+                    help="root of the streamed metrics logs")
+parser.add_argument("--record", default=RECORD_DIR, metavar="DIR",
+                    help="save each episode to DIR for python -m "
+                         "environment.recording")
+parser.add_argument("--profile", action="store_true", default=PROFILE,
+                    help="time each phase of env.step and print a summary")
+parser.add_argument("--profile-capture", type=int, default=PROFILE_CAPTURE,
+                    metavar="N", help="cProfile/tracemalloc N env steps")
+parser.add_argument("--profile-start", type=int, default=PROFILE_START,
+                    metavar="STEP", help="global step the capture starts at")
+args = parser.parse_args()
+if args.train and args.mode != "trained":
+    parser.error("--train requires --mode trained")
+
+TRAIN = args.train
+MODE = args.mode
+EPISODES = args.episodes
+RENDER_EVERY = 0 if args.headless else args.render_every
+PPO_EPOCHS = args.ppo_epochs
+MINIBATCH_SIZE = args.minibatch_size
+TARGET_KL = args.target_kl
+TORCH_THREADS = args.threads
+SEED = args.seed
+INFERENCE = "torch" if TRAIN else args.inference
+if MODE == "random" and not TRAIN:
+    INFERENCE = None   # no policy to load
+STEP_BACKEND = args.step_backend
+PROFILE_CAPTURE = args.profile_capture
+RECORD_DIR = args.record
+METRICS_DIR = args.metrics_dir
+# Training and demo runs log apart: opening a log without resuming clears it
+RUN_METRICS_DIR = os.path.join(
+    METRICS_DIR, "train" if TRAIN else f"demo_{MODE}"
+)
+PROFILE = args.profile or PROFILE_CAPTURE > 0
+
+
+if INFERENCE == "torch":
+    import torch
+    from learning.policy import PolicyNet
+    from learning.agent import PPOAgent
+
+if SEED is not None:
+    random.seed(SEED)
+    np.random.seed(SEED)
+    if INFERENCE == "torch":
+        torch.manual_seed(SEED)
 
-agent = PPOAgent(policy)
-buffer = RolloutBuffer()
 
+# ----------- ENV SETUP -----------
+scenario = Scenario("configs/scenario.yaml")
+env = Environment(scenario, profile=PROFILE, step_backend=STEP_BACKEND)
 
-# ----------- LOAD MODEL IF EXISTS -----------
-if os.path.exists(CHECKPOINT_PATH):
+if RENDER_EVERY > 0:
+    from environment.pygame_renderer import PygameRenderer
+    renderer = PygameRenderer(scenario)
+else:
+    from environment.null_renderer import NullRenderer
+    renderer = NullRenderer(scenario)
+
+recorder = None
+if RECORD_DIR:
+    from environment.recording import EpisodeRecorder
+    os.makedirs(RECORD_DIR, exist_ok=True)
+    recorder = EpisodeRecorder(env)
+
+if INFERENCE == "torch":
+    policy = PolicyNet.from_spec(env.spec)
+    optimizer = torch.optim.Adam(policy.parameters(), lr=3e-4)
+    agent = PPOAgent(policy)
+
+if TRAIN:
+    from learning.buffer import RolloutBuffer
+    from learning.ppo import ppo_update
+    from learning.checkpoint import CheckpointManager
+    buffer = RolloutBuffer(
+        STEPS_PER_UPDATE, env.num_drones, env.obs_dim, env.act_dim
+    )
+
+
+# ----------- LOAD MODEL / RESUME TRAINING -----------
+start_episode = 0
+total_steps = 0
+metrics_rows = None
+resumed = None
+
+if TRAIN:
+    checkpoints = CheckpointManager(
+        CHECKPOINT_DIR, keep_last=KEEP_CHECKPOINTS,
+        weights_path=CHECKPOINT_PATH, export_path=EXPORT_PATH,
+        fresh=args.fresh
+    )
+    if not args.fresh:
+        resumed = checkpoints.resume(policy, optimizer)
+
+if resumed:
+    last_episode, counters = resumed
+    start_episode = last_episode + 1
+    total_steps = counters["total_steps"]
+    buffer.load_state_dict(counters["buffer"])
+    metrics_rows = counters["metrics"]
+    print(f"✅ Resumed training after episode {last_episode}")
+elif INFERENCE == "numpy":
+    from learning.numpy_policy import NumpyPolicy
+    if not os.path.exists(EXPORT_PATH):
+        raise SystemExit(
+            f"{EXPORT_PATH} not found; create it with "
+            f"python -m learning.numpy_policy {CHECKPOINT_PATH}"
+        )
+    agent = NumpyPolicy(EXPORT_PATH)
+    if SEED is not None:
+        agent.seed(SEED)
+    print("✅ Loaded trained policy (NumPy)")
+elif INFERENCE is None:
+    print("🎲 Random policy")
+elif os.path.exists(CHECKPOINT_PATH) and not (TRAIN and args.fresh):
     policy.load_state_dict(torch.load(CHECKPOINT_PATH))
     print("✅ Loaded trained policy")
 else:
@@ -49,66 +196,115 @@ else:
 
 
 # ================= MAIN LOOP =================
-for episode in range(EPISODES if TRAIN else 1):
+metrics = MetricsWriter(RUN_METRICS_DIR, resume=metrics_rows)
+if metrics_rows and not metrics.resumed:
+    print(f"⚠️  {RUN_METRICS_DIR} does not match the checkpoint; "
+          f"starting a new metrics log")
 
-    obs = env.reset()
+# Observation buffers, swapped every step: the rollout buffer still needs
+# the observations an action was chosen from after the step has run
+obs = np.zeros((env.num_drones, env.obs_dim), dtype=np.float32)
+next_obs = np.zeros_like(obs)
+
+for episode in range(start_episode, EPISODES if TRAIN else 1):
+
+    env.reset_arrays(obs)
+    if recorder:
+        recorder.start()
     done = False
-    step_count = 0
     episode_reward = 0.0
+    episode_steps = 0
+    episode_start = time.perf_counter()
 
     while not done:
-        actions = {}
-
-        # ---- POLICY ACTIONS ----
-        for i in obs:
-            if MODE == "trained":
-                action, log_prob, value = agent.act(obs[i])
-            else:
-                action = env.random_actions()[i]
-
-            actions[i] = action
-
-
-            if TRAIN:
-                buffer.obs.append(obs[i])
-                buffer.actions.append(action)
-                buffer.log_probs.append(log_prob)
-                buffer.values.append(value)
-
-        obs, rewards, done, _ = env.step(actions)
+        # ---- POLICY ACTIONS (one forward pass for all drones) ----
+        if MODE == "trained":
+            actions, batch_log_probs, batch_values = agent.act_batch(obs)
+        else:
+            actions = np.array(list(env.random_actions().values()))
+
+        if PROFILE_CAPTURE and total_steps == args.profile_start:
+            capture_path = f"{PROFILE_DIR}/step_{total_steps}.prof"
+            env.profiler.capture(PROFILE_CAPTURE, capture_path, memory=True)
+            print(f"🔬 Capturing {PROFILE_CAPTURE} steps to {capture_path}")
+
+        step_start = time.perf_counter()
+        _, step_rewards, active, done, _ = env.step_arrays(
+            actions, obs=next_obs
+        )
+        step_time = time.perf_counter() - step_start
+        if recorder:
+            recorder.record()
 
         if TRAIN:
-            for i in rewards:
-                buffer.rewards.append(rewards[i])
-                buffer.dones.append(done)
-                episode_reward += rewards[i]
-
-        renderer.draw(env)
-        coverage = env.coverage_grid.get_coverage_percentage()
-        coverage_history.append(coverage)
+            buffer.add(obs, actions, batch_log_probs,
+                       batch_values, step_rewards, done)
+        obs, next_obs = next_obs, obs
+        episode_reward += step_rewards.sum()
 
-        step_count += 1
+        total_steps += 1
+        episode_steps += 1
+        if RENDER_EVERY > 0 and total_steps % RENDER_EVERY == 0:
+            renderer.draw(env)
 
-        # ---- PPO UPDATE ----
-        if TRAIN and step_count >= STEPS_PER_UPDATE:
-            ppo_update(policy, optimizer, buffer)
+        coverage = env.coverage_grid.get_coverage_percentage()
+        metrics.log_step(
+            total_steps, episode, coverage, step_rewards.sum(),
+            active.sum(), env.battery.mean(), step_time
+        )
+
+        # ---- PPO UPDATE (every STEPS_PER_UPDATE env steps) ----
+        if TRAIN and buffer.full:
+            # The buffer is cut mid-episode: bootstrap from the value of
+            # the observation after its last step (ignored when done)
+            with torch.no_grad():
+                _, _, last_values = policy(torch.from_numpy(obs))
+            stats = ppo_update(
+                policy, optimizer, buffer,
+                epochs=PPO_EPOCHS,
+                minibatch_size=MINIBATCH_SIZE,
+                max_grad_norm=MAX_GRAD_NORM,
+                target_kl=TARGET_KL,
+                num_threads=TORCH_THREADS,
+                last_values=last_values.squeeze(-1).numpy(),
+            )
             buffer.clear()
-            step_count = 0
+            print(
+                f"PPO update | {stats['samples']} samples in "
+                f"{stats['update_time']:.3f}s "
+                f"({stats['samples_per_sec']:.0f} samples/s, "
+                f"{stats['epochs']} epochs, KL {stats['approx_kl']:.4f})"
+            )
+
+    final_coverage = env.coverage_grid.get_coverage_percentage()
+    metrics.log_episode(
+        episode, episode_steps, episode_reward, final_coverage,
+        time.perf_counter() - episode_start
+    )
+    metrics.flush()
+
+    if recorder:
+        recorder.save(os.path.join(RECORD_DIR, f"episode_{episode:04d}.npz"))
 
     if TRAIN:
-        torch.save(policy.state_dict(), CHECKPOINT_PATH)
-        reward_history.append(episode_reward)
+        # Copied here, written to disk by a background thread
+        if (episode + 1) % CHECKPOINT_EVERY == 0 or episode + 1 == EPISODES:
+            checkpoints.save(
+                episode, policy, optimizer, metric=final_coverage,
+                total_steps=total_steps,
+                buffer=buffer.state_dict(),
+                metrics=metrics.rows(),
+            )
         print(f"Episode {episode} | Total Reward: {episode_reward:.2f}")
 
-print("✅ Simulation finished")
-
-import numpy as np
+    if PROFILE:
+        print(f"Step profile after episode {episode}:")
+        print(env.profiler.format_summary())
 
-if MODE == "trained":
-    np.save("coverage_trained.npy", np.array(coverage_history))
-    print("📊 Saved trained coverage")
-else:
-    np.save("coverage_random.npy", np.array(coverage_history))
-    print("📊 Saved random coverage")
+metrics.close()
+if TRAIN:
+    checkpoints.close()
+print("✅ Simulation finished")
+print(f"📊 Metrics in {RUN_METRICS_DIR}")
 
 
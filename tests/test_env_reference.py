@@ -0,0 +1,91 @@
+"""
+Environment's dict API against reference episodes from the original
+per-drone implementation.
+
+With dtype=np.float64 the array-backed Environment must reproduce the
+observations, rewards and done flags of the original dict-of-drones code
+exactly, so policies trained on it see the same inputs. The reference
+file was written by running this module as a script from a checkout of
+the original code (commit cf378f2), whose Environment takes no dtype:
+
+    python -m tests.test_env_reference
+"""
+import os
+import random
+
+import numpy as np
+import pytest
+
+from environment.env import Environment
+from environment.scenario_loader import Scenario
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCENARIO_PATH = os.path.join(ROOT, "configs", "scenario.yaml")
+REFERENCE_PATH = os.path.join(ROOT, "tests", "data", "env_reference.npz")
+
+SEEDS = range(3)
+DRONES = 8
+
+
+def make_scenario():
+    scenario = Scenario(SCENARIO_PATH)
+    scenario.drones["count"] = DRONES
+    # Drain batteries within the episode so dead drones are covered too
+    scenario.drone_model["move_cost"] = scenario.drone_model["max_battery"] / 60
+    return scenario
+
+
+def dict_episode(env, seed):
+    """
+    Seeded reset and steps with a random subset of drones acting. Returns
+    observations (steps + 1, N, 9), rewards (steps, N; NaN for drones
+    that did not act) and done flags (steps,).
+    """
+    rng = np.random.default_rng(seed)
+    random.seed(seed)
+
+    obs = env.reset()
+    observations = [np.stack([obs[i] for i in range(DRONES)])]
+    rewards, dones = [], []
+    done = False
+    while not done:
+        actions = {
+            i: tuple(rng.uniform(-1, 1, size=2))
+            for i in range(DRONES) if rng.random() < 0.8
+        }
+        obs, step_rewards, done, _ = env.step(actions)
+
+        observations.append(np.stack([obs[i] for i in range(DRONES)]))
+        row = np.full(DRONES, np.nan)
+        for i, r in step_rewards.items():
+            row[i] = r
+        rewards.append(row)
+        dones.append(done)
+
+    return (np.array(observations), np.array(rewards),
+            np.array(dones, dtype=bool))
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_dict_api_matches_reference(seed):
+    with np.load(REFERENCE_PATH) as reference:
+        expected = [reference[f"{name}_{seed}"]
+                    for name in ("obs", "rewards", "dones")]
+
+    env = Environment(make_scenario(), dtype=np.float64)
+    for name, got, want in zip(("obs", "rewards", "dones"),
+                               dict_episode(env, seed), expected):
+        assert got.dtype == want.dtype and got.shape == want.shape, name
+        np.testing.assert_array_equal(got, want, err_msg=name)
+
+
+if __name__ == "__main__":
+    arrays = {}
+    for seed in SEEDS:
+        obs, rewards, dones = dict_episode(Environment(make_scenario()), seed)
+        arrays.update({f"obs_{seed}": obs, f"rewards_{seed}": rewards,
+                       f"dones_{seed}": dones})
+
+    os.makedirs(os.path.dirname(REFERENCE_PATH), exist_ok=True)
+    np.savez_compressed(REFERENCE_PATH, **arrays)
+    print(f"wrote {REFERENCE_PATH}")
@@ -0,0 +1,99 @@
+"""
+NumpyPolicy against the torch PolicyNet it was exported from.
+
+The shipped checkpoint and a freshly initialised policy with a message
+head are exported to .npz; forward() and act_batch() must give the same
+means, stds, values and log-probs as PolicyNet to within float32
+rounding, for single observations and (N, obs_dim) / (B, N, obs_dim)
+batches.
+"""
+import os
+
+import numpy as np
+import pytest
+import torch
+from torch.distributions import Normal
+
+from environment.scenario_loader import Scenario
+from learning.numpy_policy import NumpyPolicy, export_policy
+from learning.policy import PolicyNet
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCENARIO_PATH = os.path.join(ROOT, "configs", "scenario.yaml")
+CHECKPOINT_PATH = os.path.join(ROOT, "checkpoints", "policy_latest.pth")
+
+SHAPES = [(), (16,), (3, 16)]
+
+
+def trained_policy():
+    policy = PolicyNet.from_spec(Scenario(SCENARIO_PATH).compile())
+    policy.load_state_dict(torch.load(CHECKPOINT_PATH))
+    return policy
+
+
+def message_policy():
+    scenario = Scenario(SCENARIO_PATH)
+    scenario.communication["message_dim"] = 4
+    torch.manual_seed(0)
+    policy = PolicyNet.from_spec(scenario.compile())
+    # Away from the zero init, so a mixed-up std would show
+    with torch.no_grad():
+        policy.log_std.uniform_(-1.0, 0.5)
+        policy.message_log_std.uniform_(-1.0, 0.5)
+    return policy
+
+
+@pytest.fixture(params=["trained", "messages"])
+def policies(request, tmp_path):
+    policy = trained_policy() if request.param == "trained" else message_policy()
+    path = tmp_path / "policy.npz"
+    export_policy(policy, path)
+    return policy, NumpyPolicy(path)
+
+
+def observations(policy, shape, seed=0):
+    rng = np.random.default_rng(seed)
+    obs_dim = policy.fc1.in_features
+    return rng.uniform(-1, 1, size=shape + (obs_dim,)).astype(np.float32)
+
+
+@pytest.mark.parametrize("shape", SHAPES)
+def test_forward_matches_torch(policies, shape):
+    policy, numpy_policy = policies
+    obs = observations(policy, shape)
+
+    with torch.no_grad():
+        mean, std, value = policy(torch.from_numpy(obs))
+    np_mean, np_std, np_value = numpy_policy.forward(obs)
+
+    assert np_mean.dtype == np.float32 and np_mean.shape == mean.shape
+    np.testing.assert_allclose(np_mean, mean.numpy(), rtol=0, atol=1e-6)
+    np.testing.assert_allclose(np_std, std.numpy(), rtol=1e-6)
+    np.testing.assert_allclose(np_value, value.numpy(), rtol=0, atol=1e-6)
+
+
+@pytest.mark.parametrize("shape", SHAPES[1:])
+@pytest.mark.parametrize("deterministic", [False, True])
+def test_act_batch_matches_torch(policies, shape, deterministic):
+    policy, numpy_policy = policies
+    obs = observations(policy, shape)
+    numpy_policy.seed(0)
+
+    action, log_prob, value = numpy_policy.act_batch(obs, deterministic)
+
+    with torch.no_grad():
+        mean, std, torch_value = policy(torch.from_numpy(obs))
+        torch_log_prob = Normal(mean, std).log_prob(
+            torch.from_numpy(action)
+        ).sum(dim=-1)
+
+    assert action.shape == mean.shape
+    assert log_prob.shape == value.shape == shape
+    if deterministic:
+        np.testing.assert_allclose(action, mean.numpy(), rtol=0, atol=1e-6)
+    np.testing.assert_allclose(
+        log_prob, torch_log_prob.numpy(), rtol=0, atol=1e-5
+    )
+    np.testing.assert_allclose(
+        value, torch_value.squeeze(-1).numpy(), rtol=0, atol=1e-6
+    )
@@ -0,0 +1,80 @@
+"""
+Startup cost of the entry points, measured with `python -X importtime`.
+
+Evaluation runs are often many short processes, so the modules they import
+are a fixed cost on every one. These tests keep torch, pygame and
+matplotlib off the paths that do not use them and hold the total import
+time under a budget.
+"""
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY = ("torch", "pygame", "matplotlib")
+
+# Sum of top-level cumulative import times; numpy alone is ~70 ms here
+IMPORT_BUDGET_MS = 400
+
+
+def importtime(*args):
+    """
+    Run `python -X importtime <args>` in the repo root. Returns the set of
+    imported module names and the total import time in ms.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        cwd=ROOT, capture_output=True, text=True, timeout=300,
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+
+    modules = set()
+    total_us = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue   # header line
+        modules.add(name.strip())
+        # Nested imports are indented below their parent
+        if not name[1:].startswith(" "):
+            total_us += int(cumulative)
+
+    return modules, total_us / 1000
+
+
+def assert_light(modules, total_ms):
+    heavy = sorted(
+        m for m in modules if m.split(".")[0] in HEAVY
+    )
+    assert not heavy, f"heavy modules imported: {heavy[:10]}"
+    assert total_ms < IMPORT_BUDGET_MS, (
+        f"imports took {total_ms:.0f} ms (budget {IMPORT_BUDGET_MS} ms)"
+    )
+
+
+def test_environment_import():
+    modules, total_ms = importtime(
+        "-c", "import environment.env, environment.scenario_loader"
+    )
+    assert_light(modules, total_ms)
+    assert "cProfile" not in modules
+
+
+# Runs log to a temporary directory, never the user's metrics/
+def test_headless_random_run(tmp_path):
+    modules, total_ms = importtime(
+        "run_simulation.py", "--headless", "--mode", "random", "--seed", "0",
+        "--metrics-dir", str(tmp_path)
+    )
+    assert_light(modules, total_ms)
+
+
+def test_headless_numpy_inference_run(tmp_path):
+    modules, total_ms = importtime(
+        "run_simulation.py", "--headless", "--inference", "numpy",
+        "--seed", "0", "--metrics-dir", str(tmp_path)
+    )
+    assert_light(modules, total_ms)
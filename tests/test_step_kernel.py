@@ -0,0 +1,141 @@
+"""
+The Numba step backend against the NumPy step.
+
+With float64 state both backends must produce identical episodes: every
+observation, reward, active mask and the state arrays after every step,
+for random seeds, swarm sizes and obstacle counts, through both the array
+and the dict API.
+"""
+import os
+import random
+
+import numpy as np
+import pytest
+
+from environment import step_kernel
+from environment.env import Environment
+from environment.scenario_loader import Scenario
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCENARIO_PATH = os.path.join(ROOT, "configs", "scenario.yaml")
+
+SEEDS = range(5)
+
+needs_numba = pytest.mark.skipif(
+    not step_kernel.AVAILABLE, reason="numba not installed"
+)
+
+
+def make_scenario(drones, obstacles):
+    scenario = Scenario(SCENARIO_PATH)
+    scenario.drones["count"] = drones
+    scenario.obstacles["count"] = obstacles
+    # Drain batteries within the episode so dead drones are covered too
+    scenario.drone_model["move_cost"] = scenario.drone_model["max_battery"] / 80
+    return scenario
+
+
+def array_episode(step_backend, seed, drones, obstacles):
+    """Everything an array-API episode produces, step by step."""
+    env = Environment(make_scenario(drones, obstacles), dtype=np.float64,
+                      step_backend=step_backend)
+    rng = np.random.default_rng(seed)
+    random.seed(seed)
+
+    trace = [env.reset_arrays().copy()]
+    done = False
+    while not done:
+        actions = rng.uniform(-1, 1, size=(drones, env.act_dim))
+        actions[rng.random(drones) < 0.1] = 0.0   # standing still
+        obs, rewards, active, done, _ = env.step_arrays(actions)
+        trace += [
+            obs.copy(), rewards.copy(), active.copy(),
+            env.pos.copy(), env.heading.copy(), env.battery.copy(),
+            env.coverage_grid.table.copy(),
+            env.coverage_grid.last_new_cells.copy(),
+            np.array([env.collisions, env.coverage_grid.covered_cells]),
+        ]
+    return trace
+
+
+def dict_episode(step_backend, seed, drones, obstacles):
+    """The same for the dict API, with a random subset acting each step."""
+    env = Environment(make_scenario(drones, obstacles), dtype=np.float64,
+                      step_backend=step_backend)
+    rng = np.random.default_rng(seed)
+    random.seed(seed)
+
+    trace = [np.stack(list(env.reset().values()))]
+    done = False
+    while not done:
+        actions = {
+            i: tuple(rng.uniform(-1, 1, size=2))
+            for i in range(drones) if rng.random() < 0.7
+        }
+        obs, rewards, done, _ = env.step(actions)
+        trace += [
+            np.stack(list(obs.values())),
+            np.array(list(rewards.items())),
+            env.heading.copy(),
+        ]
+    return trace
+
+
+def assert_same(a, b):
+    assert len(a) == len(b)
+    for step, (x, y) in enumerate(zip(a, b)):
+        assert x.dtype == y.dtype and x.shape == y.shape, step
+        assert np.array_equal(x, y), f"differs at trace entry {step}"
+
+
+@needs_numba
+@pytest.mark.parametrize("drones,obstacles", [(1, 5), (8, 5), (64, 40), (32, 0)])
+@pytest.mark.parametrize("seed", SEEDS)
+def test_array_step_matches_numpy(seed, drones, obstacles):
+    assert_same(
+        array_episode("numpy", seed, drones, obstacles),
+        array_episode("numba", seed, drones, obstacles),
+    )
+
+
+@needs_numba
+@pytest.mark.parametrize("seed", SEEDS)
+def test_dict_step_matches_numpy(seed):
+    assert_same(
+        dict_episode("numpy", seed, 12, 10),
+        dict_episode("numba", seed, 12, 10),
+    )
+
+
+@needs_numba
+def test_backend_from_scenario():
+    scenario = make_scenario(4, 5)
+    scenario.simulation["step_backend"] = "numba"
+    assert Environment(scenario).step_backend == "numba"
+    assert Environment(scenario, step_backend="numpy").step_backend == "numpy"
+
+
+def test_falls_back_without_numba(monkeypatch):
+    monkeypatch.setattr(step_kernel, "AVAILABLE", False)
+    with pytest.warns(RuntimeWarning, match="numba is not installed"):
+        env = Environment(make_scenario(4, 5), step_backend="numba")
+    assert env.step_backend == "numpy"
+
+    random.seed(0)
+    env.reset_arrays()
+    env.step_arrays(np.ones((4, env.act_dim)))
+
+
+def test_unsupported_configurations():
+    scenario = make_scenario(4, 5)
+    scenario.coverage["backend"] = "tiled"
+    with pytest.raises(ValueError):
+        Environment(scenario, step_backend="numba")
+
+    scenario = make_scenario(4, 5)
+    scenario.communication["message_dim"] = 2
+    with pytest.raises(ValueError):
+        Environment(scenario, step_backend="numba")
+
+    with pytest.raises(ValueError):
+        Environment(make_scenario(4, 5), step_backend="cuda")